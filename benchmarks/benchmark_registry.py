@@ -0,0 +1,265 @@
+"""
+Benchmarks the registry read and write hot paths of MLGitClient offline, against
+a local stand-in remote with simulated latency and bandwidth.
+
+    python benchmarks/benchmark_registry.py [--profile quick|full]
+        [--latency SECONDS] [--bandwidth BYTES_PER_SECOND] [--repeat N]
+        [--client-option NAME=JSON_VALUE ...]
+        [--baseline BASELINE_JSON [--save-baseline] [--tolerance FRACTION]
+            [--noise-seconds SECONDS] [--noise-bytes BYTES]]
+
+Each case reports its best wall time over --repeat runs, its throughput and
+the peak memory traced by tracemalloc in one further run. With --baseline,
+cases slower or more memory-hungry than the stored baseline by more than
+--tolerance are flagged and the script exits with status 1; --save-baseline
+stores the current results instead. Differences within --noise-seconds
+(default: one simulated round trip, and 5 ms at least) or --noise-bytes are
+never flagged, so that jitter on cases of a few round trips is not taken for
+a regression. Baselines are only comparable on the same
+machine with the same profile, latency, bandwidth and client options.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from pyutils.pickable import PickableObject
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mlgit.mlgit_client import MLGitClient
+from mlgit.storage import LocalStorage
+
+PROFILES = {
+    "quick": {
+        "backtest_rows": [1_000, 100_000],
+        "model_bytes": [2 ** 20, 2 ** 24],
+        "version_counts": [10, 1_000]
+    },
+    "full": {
+        "backtest_rows": [1_000, 100_000, 1_000_000, 10_000_000],
+        "model_bytes": [2 ** 20, 2 ** 26, 2 ** 30, 2 ** 31],
+        "version_counts": [10, 100, 1_000, 10_000]
+    }
+}
+
+class SimulatedRemoteStorage(LocalStorage):
+    """
+    LocalStorage that delays every call by latency seconds plus the time to
+    transfer its payload at bandwidth bytes per second.
+    """
+    def __init__(self, root_dpath: str, latency: float, bandwidth: float):
+        super().__init__(root_dpath)
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def delay(self, nbytes: int = 0) -> None:
+        time.sleep(self.latency + nbytes / self.bandwidth)
+
+    def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+        content, etag = super().read_file(remote_fpath, etag)
+        self.delay(0 if content is None else len(content))
+
+        return content, etag
+
+    def list_directory(self, remote_dpath: str) -> list:
+        self.delay()
+        return super().list_directory(remote_dpath)
+
+    def push_files(self, access_token: str, local_fpaths: list, remote_dpaths: list) -> None:
+        self.delay(sum(os.path.getsize(local_fpath) for local_fpath in local_fpaths))
+        super().push_files(access_token, local_fpaths, remote_dpaths)
+
+    def write_files(self, access_token: str, contents: dict,
+        expected_versions: dict = None) -> None:
+        self.delay(sum(len(content) for content in contents.values()))
+        super().write_files(access_token, contents, expected_versions)
+
+class BenchmarkModel(PickableObject):
+    def __init__(self, nbytes: int):
+        self.weights = np.random.default_rng(0).integers(0, 256, nbytes, dtype=np.uint8)
+
+def make_backtest(nrows: int, start: str = "2000-01-01") -> pd.DataFrame:
+    rng = np.random.default_rng(nrows)
+
+    return pd.DataFrame({
+        "prediction": rng.normal(size=nrows), "actual": rng.normal(size=nrows)
+    }, index=pd.date_range(start, periods=nrows, freq="min", name="date"))
+
+def measure(run: callable, setup: callable, repeat: int) -> dict:
+    """
+    Returns the best wall time of run over repeat runs and the peak traced
+    memory of one further run. setup is called before every run and returns
+    its arguments.
+    """
+    seconds = []
+
+    for _ in range(repeat):
+        run_args = setup()
+        start_time = time.perf_counter()
+        run(*run_args)
+        seconds.append(time.perf_counter() - start_time)
+
+    run_args = setup()
+    tracemalloc.start()
+
+    try:
+        run(*run_args)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(seconds), "peak_bytes": peak_bytes}
+
+def benchmark_cases(profile: dict, make_client: callable) -> iter:
+    """
+    Yields (case_name, units, unit_count, run, setup) for every benchmark case.
+    """
+    for nrows in profile["backtest_rows"]:
+        model_name = f"backtest_{nrows}"
+        prior_backtest = make_backtest(nrows)
+        new_backtest = make_backtest(nrows, prior_backtest.index[nrows // 2])
+        make_client().log_model_backtest("token", prior_backtest, model_name)
+
+        # Every run merges into its own copy of the prior backtest
+        def setup_log_backtest(nrows: int = nrows, prior_backtest: pd.DataFrame =
+            prior_backtest, run_ids: iter = itertools.count()) -> tuple:
+            client = make_client()
+            run_model_name = f"backtest_{nrows}_run_{next(run_ids)}"
+            client.log_model_backtest("token", prior_backtest, run_model_name)
+
+            return client, run_model_name
+
+        yield f"log_model_backtest[rows={nrows}]", "rows", nrows, \
+                lambda client, model_name, new_backtest=new_backtest: \
+                        client.log_model_backtest("token", new_backtest, model_name), \
+                setup_log_backtest
+
+        yield f"get_model_backtest[rows={nrows}]", "rows", nrows, \
+                lambda client, model_name: client.get_model_backtest(model_name), \
+                lambda model_name=model_name: (make_client(), model_name)
+
+    for nbytes in profile["model_bytes"]:
+        model_name = f"model_{nbytes}"
+        benchmark_model = BenchmarkModel(nbytes)
+
+        yield f"log_model_version[bytes={nbytes}]", "bytes", nbytes, \
+                lambda client, model_name, benchmark_model=benchmark_model: \
+                        client.log_model_version("token", benchmark_model, model_name, "v1"), \
+                lambda model_name=model_name: (make_client(), model_name)
+
+        yield f"get_model_version[bytes={nbytes}]", "bytes", nbytes, \
+                lambda client, model_name: client.get_model_version(model_name, "v1"), \
+                lambda model_name=model_name: (make_client(), model_name)
+
+        del benchmark_model
+
+    for version_count in profile["version_counts"]:
+        model_name = f"versions_{version_count}"
+        make_client().log_json_artifact("token", [
+            f"v{version_idx}" for version_idx in range(version_count)
+        ], "versions", model_name)
+
+        yield f"get_version_list[versions={version_count}]", "versions", version_count, \
+                lambda client, model_name: client.get_version_list(model_name), \
+                lambda model_name=model_name: (make_client(), model_name)
+
+def find_regressions(results: dict, baseline: dict, tolerance: float,
+    noise_floors: dict = None) -> list:
+    """
+    Returns (case_name, metric, baseline_value, value) for every metric exceeding
+    its baseline by more than tolerance and by more than its noise floor in
+    noise_floors {metric: absolute difference}.
+    """
+    noise_floors = noise_floors or {}
+    regressions = []
+
+    for case_name, result in results.items():
+        baseline_result = baseline["results"].get(case_name)
+
+        if baseline_result is None:
+            continue
+
+        for metric in ["seconds", "peak_bytes"]:
+            if result[metric] > baseline_result[metric] * (1 + tolerance) and \
+                    result[metric] - baseline_result[metric] > noise_floors.get(metric, 0):
+                regressions.append((case_name, metric, baseline_result[metric], result[metric]))
+
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", choices=list(PROFILES), default="quick")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--bandwidth", type=float, default=100e6)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--client-option", action="append", default=[])
+    parser.add_argument("--baseline")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--noise-seconds", type=float)
+    parser.add_argument("--noise-bytes", type=int, default=2 ** 20)
+    args = parser.parse_args()
+
+    client_options = {}
+
+    for client_option in args.client_option:
+        option_name, _, option_value = client_option.partition('=')
+        client_options[option_name] = json.loads(option_value)
+
+    settings = {"profile": args.profile, "latency": args.latency,
+            "bandwidth": args.bandwidth, "client_options": client_options}
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="mlgit_benchmark_") as remote_dpath:
+        storage = SimulatedRemoteStorage(remote_dpath, args.latency, args.bandwidth)
+        make_client = lambda: MLGitClient(None, None, "registry", storage=storage,
+                **client_options)
+
+        for case_name, units, unit_count, run, setup in benchmark_cases(
+                PROFILES[args.profile], make_client):
+            result = measure(run, setup, args.repeat)
+            result["throughput"] = unit_count / result["seconds"]
+            results[case_name] = result
+
+            print(f"{case_name:<40} {result['seconds']:>10.4f} s "
+                    f"{result['throughput']:>14.1f} {units}/s "
+                    f"{result['peak_bytes'] / 2 ** 20:>10.1f} MiB peak", flush=True)
+
+    if args.baseline is None:
+        return 0
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({"settings": settings, "results": results}, baseline_file, indent=2)
+
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    with open(args.baseline, 'r') as baseline_file:
+        baseline = json.load(baseline_file)
+
+    if baseline["settings"] != settings:
+        print(f"Warning: baseline settings {baseline['settings']} differ from {settings}")
+
+    regressions = find_regressions(results, baseline, args.tolerance, {
+        "seconds": max(args.latency, 0.005) if args.noise_seconds is None
+                else args.noise_seconds,
+        "peak_bytes": args.noise_bytes
+    })
+
+    for case_name, metric, baseline_value, value in regressions:
+        print(f"REGRESSION {case_name}: {metric} {baseline_value:.4g} -> {value:.4g} "
+                f"(+{value / baseline_value - 1:.0%})")
+
+    return 1 if len(regressions) > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
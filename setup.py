@@ -19,5 +19,12 @@ setup(
     include_package_data=True,
     install_requires=[
         "pytest-shutil", "pyutils"
-    ]
+    ],
+    extras_require={
+        "parquet": ["pyarrow"],
+        "joblib": ["joblib"],
+        "cloudpickle": ["cloudpickle"],
+        "zstd": ["zstandard"],
+        "lz4": ["lz4"]
+    }
 )
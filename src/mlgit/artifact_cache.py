@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+EVICTION_TARGET = 0.9 # Fraction of max_bytes kept by an eviction
+
+class ArtifactCache:
+    """
+    On-disk LRU cache of remote artifact contents.
+
+    Each entry is stored as a pair of files under cache_dpath
+        - <key_hash>.<content_id>.bin   artifact contents
+        - <key_hash>.json               entry metadata (cache key, revision,
+                                        stored_at, content file name)
+
+    Every put writes its contents to a new content file before switching the
+    metadata over to it, so a revision is only ever paired with the contents it
+    was stored with, whatever the order in which concurrent writers finish.
+
+    The modification time of the content file records the last access and
+    drives eviction, down to EVICTION_TARGET of max_bytes, once the total cached
+    size exceeds max_bytes. The total is
+    counted as entries are written, from a scan of cache_dpath on the first
+    write, and only rescanned when it exceeds max_bytes; entries written by
+    other processes sharing cache_dpath are counted from the next scan.
+    """
+    def __init__(self, cache_dpath: str, max_bytes: int = 2 ** 30,
+        max_age: float = None):
+        self.cache_dpath = cache_dpath
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.total_bytes = None # Scanned on the first put
+        self.lock = threading.Lock()
+
+        if not os.path.exists(cache_dpath):
+            os.makedirs(cache_dpath)
+
+    def key_hash(self, key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def metadata_fpath(self, key_hash: str) -> str:
+        return os.path.join(self.cache_dpath, f"{key_hash}.json")
+
+    def get_metadata(self, key: str) -> dict:
+        try:
+            with open(self.metadata_fpath(self.key_hash(key)), 'r') as metadata_file:
+                metadata = json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+        # Metadata without a content file name predates content files named per put
+        return metadata if metadata.get("key") == key and "content" in metadata else None
+
+    def is_fresh(self, metadata: dict) -> bool:
+        return self.max_age is None or time.time() - metadata["stored_at"] <= self.max_age
+
+    def read_content(self, key: str, metadata: dict = None) -> bytes:
+        """
+        Returns the contents stored with metadata, as returned by get_metadata, or
+        with the current entry for key. Returns None when they were evicted or
+        replaced in the meantime.
+        """
+        if metadata is None:
+            metadata = self.get_metadata(key)
+
+            if metadata is None:
+                return None
+
+        content_fpath = os.path.join(self.cache_dpath, metadata["content"])
+
+        try:
+            with open(content_fpath, 'rb') as content_file:
+                content = content_file.read()
+
+            os.utime(content_fpath) # Mark as most recently used
+        except OSError:
+            return None
+
+        return content
+
+    def get(self, key: str, revision: str = None) -> bytes:
+        """
+        Returns the cached contents for key, or None when the entry is missing,
+        older than max_age, or was stored under a different revision.
+        """
+        metadata = self.get_metadata(key)
+
+        if metadata is None or not self.is_fresh(metadata):
+            return None
+
+        if revision is not None and metadata.get("revision") != revision:
+            return None
+
+        return self.read_content(key, metadata)
+
+    def put(self, key: str, content: bytes, revision: str = None) -> None:
+        key_hash = self.key_hash(key)
+        content_fname = f"{key_hash}.{uuid.uuid4().hex}.bin"
+        prior_metadata = self.get_metadata(key)
+
+        self.write_atomic(os.path.join(self.cache_dpath, content_fname), content)
+        self.write_metadata(key, revision, content_fname)
+
+        prior_bytes = 0 if prior_metadata is None else self.remove_file(prior_metadata["content"])
+        self.count_bytes(len(content) - prior_bytes)
+
+    def remove_file(self, fname: str) -> int:
+        """
+        Removes a file of cache_dpath, returning its size, or 0 when it is already gone.
+        """
+        fpath = os.path.join(self.cache_dpath, fname)
+
+        try:
+            nbytes = os.path.getsize(fpath)
+            os.remove(fpath)
+        except FileNotFoundError: # Removed by a concurrent writer or process
+            return 0
+
+        return nbytes
+
+    def count_bytes(self, nbytes: int) -> None:
+        """
+        Adds nbytes to the cached total, evicting entries once it exceeds max_bytes.
+        """
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for _, size, _ in self.scan_entries())
+            else:
+                self.total_bytes += nbytes
+
+            if self.total_bytes <= self.max_bytes:
+                return
+
+        self.evict()
+
+    def refresh(self, key: str) -> None:
+        """
+        Restarts the max_age window of an entry that was revalidated against the remote.
+        """
+        metadata = self.get_metadata(key)
+
+        if metadata is not None:
+            self.write_metadata(key, metadata.get("revision"), metadata["content"])
+
+    def write_metadata(self, key: str, revision: str, content_fname: str) -> None:
+        self.write_atomic(self.metadata_fpath(self.key_hash(key)), json.dumps({
+            "key": key, "revision": revision, "stored_at": time.time(),
+            "content": content_fname
+        }).encode())
+
+    def write_atomic(self, fpath: str, data: bytes) -> None:
+        # Write-then-rename so that concurrent readers never see partial entries. The
+        # temporary name is unique to each write, so that concurrent writers of one
+        # entry, threads of one process included, never share it.
+        temp_fpath = f"{fpath}.{uuid.uuid4().hex}.tmp"
+
+        with open(temp_fpath, 'wb') as temp_file:
+            temp_file.write(data)
+
+        os.replace(temp_fpath, fpath)
+
+    def invalidate(self, key: str, metadata: dict = None) -> None:
+        """
+        Removes the entry for key, or only when it still holds the contents stored
+        with metadata, so that an entry replaced since metadata was read is kept.
+        """
+        current_metadata = self.get_metadata(key)
+
+        if current_metadata is None:
+            return
+
+        if metadata is not None and current_metadata["content"] != metadata["content"]:
+            return
+
+        self.remove_file(f"{self.key_hash(key)}.json")
+        removed_bytes = self.remove_file(current_metadata["content"])
+
+        with self.lock:
+            if self.total_bytes is not None:
+                self.total_bytes -= removed_bytes
+
+    def clear(self) -> None:
+        for fname in os.listdir(self.cache_dpath):
+            os.remove(os.path.join(self.cache_dpath, fname))
+
+        with self.lock:
+            self.total_bytes = 0
+
+    def scan_entries(self) -> list:
+        """
+        Returns (last access, size, content file name) of every cached entry.
+        """
+        entries = []
+
+        for fname in os.listdir(self.cache_dpath):
+            if not fname.endswith(".bin"):
+                continue
+
+            try:
+                stat = os.stat(os.path.join(self.cache_dpath, fname))
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, fname))
+
+        return entries
+
+    def evict(self) -> None:
+        entries = self.scan_entries()
+        total_bytes = sum(size for _, size, _ in entries)
+
+        # Least recently used entries first
+        for _, size, content_fname in sorted(entries):
+            if total_bytes <= self.max_bytes * EVICTION_TARGET:
+                break
+
+            self.remove_file(content_fname)
+            total_bytes -= size
+
+            # Drop the metadata too unless the entry was replaced since the scan
+            key_hash = content_fname.split('.')[0]
+
+            try:
+                with open(self.metadata_fpath(key_hash), 'r') as metadata_file:
+                    metadata = json.load(metadata_file)
+            except (OSError, ValueError):
+                continue
+
+            if metadata.get("content") == content_fname:
+                self.remove_file(f"{key_hash}.json")
+
+        with self.lock:
+            self.total_bytes = total_bytes
@@ -0,0 +1,204 @@
+import asyncio
+import functools
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .mlgit_client import MLGitClient
+
+ITERATION_END = object() # Returned by next once a blocking iterator is exhausted
+
+async def collect_results(results: any) -> dict:
+    return {model_name: result async for model_name, result in results}
+
+class AsyncMLGitClient:
+    """
+    Coroutine interface to MLGitClient for callers running inside an event loop.
+
+    Every registry operation runs on a dedicated pool of max_workers threads, so
+    blocking storage reads, (de)serialization and backtest merges never stall
+    the event loop. The threads share one MLGitClient, and with it one artifact
+    cache, parsed-artifact memo and model cache. Arguments are those of
+    MLGitClient.
+
+    batch_logging is not mirrored: batches are staged per thread, so use
+    run(callable) to execute a whole batch on one worker thread.
+    """
+    def __init__(self, *client_args, max_workers: int = 16, **client_kwargs):
+        self.client = MLGitClient(*client_args, **client_kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                thread_name_prefix="mlgit")
+
+    async def __aenter__(self) -> "AsyncMLGitClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.client.close()
+        self.executor.shutdown(wait=False)
+
+    async def run(self, function: callable, *args, **kwargs) -> any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def iterate(self, iterator: iter) -> any:
+        """
+        Yields the items of a blocking iterator, advancing it on the worker threads.
+        """
+        while True:
+            item = await self.run(next, iterator, ITERATION_END)
+
+            if item is ITERATION_END:
+                return
+
+            yield item
+
+    async def get_registry_manifest(self) -> dict:
+        return await self.run(self.client.get_registry_manifest)
+
+    async def list_models(self) -> list:
+        return await self.run(self.client.list_models)
+
+    async def get_version_list(self, model_name: str) -> list:
+        return await self.run(self.client.get_version_list, model_name)
+
+    async def get_latest_version(self, model_name: str) -> str:
+        return await self.run(self.client.get_latest_version, model_name)
+
+    async def get_version_count(self, model_name: str) -> int:
+        return await self.run(self.client.get_version_count, model_name)
+
+    async def get_versions_page(self, model_name: str, offset: int = 0,
+        limit: int = 100) -> list:
+        return await self.run(self.client.get_versions_page, model_name, offset, limit)
+
+    async def get_version_entries_page(self, model_name: str, offset: int = 0,
+        limit: int = 100) -> list:
+        return await self.run(self.client.get_version_entries_page, model_name, offset, limit)
+
+    def iter_versions(self, model_name: str, since: str = None) -> any:
+        return self.iterate(self.client.iter_versions(model_name, since))
+
+    def iter_version_entries(self, model_name: str, since: str = None) -> any:
+        return self.iterate(self.client.iter_version_entries(model_name, since))
+
+    async def get_json_artifact(self, artifact_name: str, model_name: str,
+        model_version: any = None) -> any:
+        return await self.run(self.client.get_json_artifact, artifact_name, model_name,
+                model_version)
+
+    async def get_pandas_artifact(self, artifact_name: str, model_name: str,
+        model_version: str = None, columns: list = None, **read_kwargs) -> pd.DataFrame:
+        return await self.run(self.client.get_pandas_artifact, artifact_name, model_name,
+                model_version, columns, **read_kwargs)
+
+    async def get_model_backtest(self, model_name: str, start: any = None, end: any = None,
+        columns: list = None, version_timestamp: any = None) -> pd.DataFrame:
+        return await self.run(self.client.get_model_backtest, model_name, start, end,
+                columns, version_timestamp)
+
+    async def get_backtest_segments(self, model_name: str) -> list:
+        return await self.run(self.client.get_backtest_segments, model_name)
+
+    def get_many_version_lists(self, model_names: list, stream: bool = False,
+        max_workers: int = None) -> any:
+        return self.get_many(self.client.get_version_list, model_names, stream, max_workers)
+
+    def get_many_backtests(self, model_names: list, stream: bool = False,
+        max_workers: int = None, **backtest_kwargs) -> any:
+        return self.get_many(self.client.get_model_backtest, model_names, stream,
+                max_workers, **backtest_kwargs)
+
+    def get_many(self, get_function: callable, model_names: list, stream: bool = False,
+        max_workers: int = None, **get_kwargs) -> any:
+        """
+        Like MLGitClient.get_many: returns an awaitable of {model_name: result}, or
+        when stream is set, an async iterator of (model_name, result) pairs in
+        completion order.
+        """
+        results = self.iter_many(get_function, model_names, max_workers, **get_kwargs)
+        return results if stream else collect_results(results)
+
+    async def iter_many(self, get_function: callable, model_names: list,
+        max_workers: int = None, **get_kwargs) -> any:
+        semaphore = asyncio.Semaphore(max_workers or self.client.download_concurrency)
+
+        async def get(model_name: str) -> tuple:
+            async with semaphore:
+                return model_name, await self.run(get_function, model_name, **get_kwargs)
+
+        tasks = [asyncio.ensure_future(get(model_name)) for model_name in
+                dict.fromkeys(model_names)]
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally: # Stop pending calls when the consumer stops early or a call fails
+            for task in tasks:
+                task.cancel()
+
+    async def get_model_version(self, model_name: str, model_version: str) -> any:
+        return await self.run(self.client.get_model_version, model_name, model_version)
+
+    async def prefetch(self, model_name: str, versions: list = None) -> list:
+        """
+        Prefetches like MLGitClient.prefetch and waits until the models are restored.
+        """
+        prefetch_futures = await self.run(self.client.prefetch, model_name, versions)
+
+        return list(await asyncio.gather(*[
+            asyncio.wrap_future(prefetch_future) for prefetch_future in prefetch_futures
+        ]))
+
+    def track_latest(self, model_name: str, poll_interval: float = 60) -> None:
+        self.client.track_latest(model_name, poll_interval)
+
+    def stop_tracking(self, model_name: str = None) -> None:
+        self.client.stop_tracking(model_name)
+
+    async def register_model(self, access_token: str, model_name: str) -> None:
+        return await self.run(self.client.register_model, access_token, model_name)
+
+    async def rebuild_registry_manifest(self, access_token: str, model_names: list) -> None:
+        return await self.run(self.client.rebuild_registry_manifest, access_token, model_names)
+
+    async def log_artifact(self, access_token: str, artifact_fpath: str,
+        model_name: str, model_version: str = None) -> None:
+        return await self.run(self.client.log_artifact, access_token, artifact_fpath,
+                model_name, model_version)
+
+    async def log_json_artifact(self, access_token: str, json_artifact: any,
+        artifact_name: str, model_name: str, model_version: str = None) -> None:
+        return await self.run(self.client.log_json_artifact, access_token, json_artifact,
+                artifact_name, model_name, model_version)
+
+    async def log_pandas_artifact(self, access_token: str, pandas_artifact: pd.DataFrame,
+        artifact_name: str, model_name: str, model_version: str = None,
+        **write_kwargs) -> None:
+        return await self.run(self.client.log_pandas_artifact, access_token, pandas_artifact,
+                artifact_name, model_name, model_version, **write_kwargs)
+
+    async def log_model_backtest(self, access_token: str, model_backtest: pd.DataFrame,
+        model_name: str, version_timestamp: any = None) -> None:
+        return await self.run(self.client.log_model_backtest, access_token, model_backtest,
+                model_name, version_timestamp)
+
+    async def compact_backtest(self, access_token: str, model_name: str) -> None:
+        return await self.run(self.client.compact_backtest, access_token, model_name)
+
+    async def log_model_version(self, access_token: str, pickable_model: any,
+        model_name: str, model_version: str, model_serializer: any = None) -> None:
+        return await self.run(self.client.log_model_version, access_token, pickable_model,
+                model_name, model_version, model_serializer)
+
+    async def log_model_version_from_local(self, access_token: str, model_name: str,
+        model_version: str, model_version_local_dpath: str) -> None:
+        return await self.run(self.client.log_model_version_from_local, access_token,
+                model_name, model_version, model_version_local_dpath)
+
+    def invalidate_model_cache(self, model_name: str = None, model_version: str = None) -> None:
+        self.client.invalidate_model_cache(model_name, model_version)
@@ -0,0 +1,57 @@
+import pandas as pd
+
+def merge_backtests(prior_model_backtest: pd.DataFrame, model_backtest: pd.DataFrame,
+    version_timestamp: pd.Timestamp) -> pd.DataFrame:
+    """
+    Merges model_backtest, logged at version_timestamp, into prior_model_backtest.
+
+    For dates present in both backtests the rows of model_backtest take precedence when
+        - the prior row was logged by the same version_timestamp
+        - index <= version_timestamp and the prior row is from a newer version
+          (previous versions take precedence)
+        - index > version_timestamp and the prior row is from an older version
+          (newer versions take precedence)
+
+    Every other prior row is kept, and dates only in model_backtest are appended.
+    Both backtests must carry a "version_timestamp" column and a unique DatetimeIndex.
+    """
+    prior_version_timestamps = prior_model_backtest["version_timestamp"] \
+            .reindex(model_backtest.index)
+    index_values = model_backtest.index.to_series(index=model_backtest.index)
+
+    # Comparisons against NaT (dates absent from the prior backtest) evaluate to False
+    model_backtest_precedence = prior_version_timestamps.isna() | \
+            (prior_version_timestamps == version_timestamp) | \
+            ((index_values <= version_timestamp) & (prior_version_timestamps > version_timestamp)) | \
+            ((index_values > version_timestamp) & (prior_version_timestamps < version_timestamp))
+
+    precedent_model_backtest = model_backtest[model_backtest_precedence.to_numpy()]
+
+    return pd.concat([
+        prior_model_backtest[~prior_model_backtest.index.isin(precedent_model_backtest.index)],
+        precedent_model_backtest
+    ], axis=0).sort_index()
+
+def filter_backtest(model_backtest: pd.DataFrame, start: any = None, end: any = None,
+    version_timestamp: any = None) -> pd.DataFrame:
+    """
+    Keeps the rows of model_backtest dated within [start, end] and, when
+    version_timestamp is given, logged at version_timestamp.
+    """
+    row_mask = pd.Series(True, index=model_backtest.index)
+
+    if start is not None:
+        row_mask &= model_backtest.index >= pd.Timestamp(start)
+
+    if end is not None:
+        row_mask &= model_backtest.index <= pd.Timestamp(end)
+
+    if version_timestamp is not None:
+        row_mask &= model_backtest["version_timestamp"] == pd.Timestamp(version_timestamp)
+
+    return model_backtest[row_mask.to_numpy()]
+
+def overlaps_backtest_range(backtest_segment: dict, start: any = None,
+    end: any = None) -> bool:
+    return (start is None or pd.Timestamp(backtest_segment["end"]) >= pd.Timestamp(start)) \
+            and (end is None or pd.Timestamp(backtest_segment["start"]) <= pd.Timestamp(end))
@@ -0,0 +1,150 @@
+import hashlib
+import numbers
+import os
+
+import numpy as np
+
+OBJECTS_DNAME = "objects"
+VERSION_OBJECTS_FNAME = ".objects.json"
+CDC_WINDOW_BYTES = 48
+CDC_MIN_CHUNK_BYTES = 4 * CDC_WINDOW_BYTES
+CDC_BLOCK_BYTES = 2 ** 23
+CDC_MIX = np.uint32(0x9E3779B1)
+
+# Fixed per-byte values of the rolling hash, derived from SHA-256 so that chunk
+# boundaries never change between releases or platforms
+CDC_GEAR = np.frombuffer(b''.join(
+    hashlib.sha256(bytes([byte_value])).digest()[:4] for byte_value in range(256)
+), dtype="<u4").astype(np.uint32)
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def validate_chunk_bytes(chunk_bytes: int, content_defined: bool = False) -> None:
+    """
+    Raises ValueError unless chunk_bytes is None or a valid chunk size: positive,
+    and CDC_MIN_CHUNK_BYTES or more for content_defined chunks, whose rolling hash
+    spans CDC_WINDOW_BYTES.
+    """
+    if chunk_bytes is None:
+        return
+
+    min_chunk_bytes = CDC_MIN_CHUNK_BYTES if content_defined else 1
+
+    if not isinstance(chunk_bytes, numbers.Integral) or chunk_bytes < min_chunk_bytes:
+        raise ValueError(f"chunk size must be an integer of {min_chunk_bytes} bytes or more"
+                f"{' with content defined chunks' if content_defined else ''}, "
+                f"not {chunk_bytes!r}")
+
+def iter_fixed_chunks(local_file: any, chunk_bytes: int = None) -> iter:
+    """
+    Yields the content of local_file in chunks of chunk_bytes, the last one shorter,
+    or as a single chunk when chunk_bytes is None.
+    """
+    while True:
+        chunk = local_file.read(chunk_bytes)
+
+        if len(chunk) == 0:
+            return
+
+        yield chunk
+
+def find_chunk_boundaries(content: np.ndarray, min_bytes: int, max_bytes: int,
+    hash_threshold: int, final: bool) -> list:
+    """
+    Returns the end offsets of the chunks cut from the start of content, leaving
+    out the trailing bytes whose boundary depends on content not yet read unless
+    final. A chunk ends where the rolling hash of its last CDC_WINDOW_BYTES bytes
+    is below hash_threshold, within [min_bytes, max_bytes].
+    """
+    window_sums = np.zeros(len(content) + 1, dtype=np.uint32)
+    np.cumsum(CDC_GEAR[content], dtype=np.uint32, out=window_sums[1:]) # Wraps around
+
+    window_hashes = (window_sums[CDC_WINDOW_BYTES:] - window_sums[:-CDC_WINDOW_BYTES]) * CDC_MIX
+    candidate_ends = np.flatnonzero(window_hashes < np.uint32(hash_threshold)) + \
+            CDC_WINDOW_BYTES
+
+    chunk_ends = []
+    chunk_start = 0
+
+    while True:
+        candidate_idx = np.searchsorted(candidate_ends, chunk_start + min_bytes)
+        chunk_end = int(candidate_ends[candidate_idx]) \
+                if candidate_idx < len(candidate_ends) else None
+
+        if chunk_end is None or chunk_end > chunk_start + max_bytes:
+            if chunk_start + max_bytes > len(content):
+                break
+
+            chunk_end = chunk_start + max_bytes
+
+        chunk_ends.append(chunk_end)
+        chunk_start = chunk_end
+
+    if final and chunk_start < len(content):
+        chunk_ends.append(len(content))
+
+    return chunk_ends
+
+def iter_content_defined_chunks(local_file: any, avg_chunk_bytes: int) -> iter:
+    """
+    Yields the content of local_file in chunks of avg_chunk_bytes on average and
+    between a quarter and four times that, cut where the content matches rather
+    than at fixed offsets. Inserting or removing bytes only changes the chunks
+    around the edit, so consecutive versions of a file share most chunks.
+    """
+    min_bytes = max(avg_chunk_bytes // 4, CDC_WINDOW_BYTES)
+    max_bytes = avg_chunk_bytes * 4
+    # Boundaries occur every avg_chunk_bytes - min_bytes bytes on average past min_bytes
+    hash_threshold = 2 ** 32 // max(avg_chunk_bytes - min_bytes, 1)
+    pending = b''
+
+    while True:
+        block = local_file.read(max(CDC_BLOCK_BYTES, 2 * max_bytes))
+        final = len(block) == 0
+        pending += block
+        chunk_start = 0
+
+        for chunk_end in find_chunk_boundaries(np.frombuffer(pending, dtype=np.uint8),
+                min_bytes, max_bytes, hash_threshold, final):
+            yield pending[chunk_start:chunk_end]
+            chunk_start = chunk_end
+
+        if final:
+            return
+
+        pending = pending[chunk_start:]
+
+def make_chunks_manifest(local_fpath: str, chunk_bytes: int = None,
+    content_defined: bool = False) -> dict:
+    """
+    Returns the chunks manifest of local_fpath
+        {"size", "chunking": {"method", "chunk_bytes"}, "chunks": [[sha256, size]]}
+    reading the file one chunk at a time. A file stored whole has a single chunk,
+    and content_defined chunks are chunk_bytes long on average.
+    """
+    validate_chunk_bytes(chunk_bytes, content_defined)
+
+    if chunk_bytes is None:
+        chunking = {"method": "whole"}
+    else:
+        chunking = {"method": "content_defined" if content_defined else "fixed",
+                "chunk_bytes": chunk_bytes}
+
+    with open(local_fpath, 'rb') as local_file:
+        chunks = [
+            [content_hash(chunk), len(chunk)]
+            for chunk in (iter_content_defined_chunks(local_file, chunk_bytes)
+                    if content_defined and chunk_bytes is not None
+                    else iter_fixed_chunks(local_file, chunk_bytes))
+        ]
+
+    return {"size": os.path.getsize(local_fpath), "chunking": chunking, "chunks": chunks}
+
+def chunk_offsets(chunks_manifest: dict) -> list:
+    offsets = [0]
+
+    for _, chunk_size in chunks_manifest["chunks"][:-1]:
+        offsets.append(offsets[-1] + chunk_size)
+
+    return offsets
@@ -0,0 +1,149 @@
+import gzip
+import io
+import os
+import shutil
+
+STREAM_CHUNK_BYTES = 2 ** 20
+
+class Codec:
+    """
+    Compression codec of artifacts, recognized on read by the magic bytes that
+    start its frames, so that compressed and uncompressed artifacts can be read
+    alike whatever the settings of the client that logged them.
+    """
+    name = None
+    magic = None
+
+    def compress(self, content: bytes, level: int = None) -> bytes:
+        raise NotImplementedError()
+
+    def open(self, fileobj: any, mode: str = 'rb', level: int = None) -> any:
+        """
+        Returns a file object (de)compressing from or to fileobj as it is read or
+        written. Closing it leaves fileobj open.
+        """
+        raise NotImplementedError()
+
+    def decompress(self, artifact: bytes) -> bytes:
+        with self.open(io.BytesIO(artifact)) as artifact_file:
+            return artifact_file.read()
+
+class GzipCodec(Codec):
+    name = "gzip"
+    magic = b"\x1f\x8b"
+
+    # No timestamp in the header, so equal contents compress to equal (deduplicated) objects
+    def compress(self, content: bytes, level: int = None) -> bytes:
+        return gzip.compress(content, compresslevel=9 if level is None else level, mtime=0)
+
+    def open(self, fileobj: any, mode: str = 'rb', level: int = None) -> any:
+        return gzip.GzipFile(fileobj=fileobj, mode=mode,
+                compresslevel=9 if level is None else level, mtime=0)
+
+    def decompress(self, artifact: bytes) -> bytes:
+        return gzip.decompress(artifact)
+
+class ZstdCodec(Codec):
+    """
+    Zstandard. Requires zstandard.
+    """
+    name = "zstd"
+    magic = b"\x28\xb5\x2f\xfd"
+
+    def compress(self, content: bytes, level: int = None) -> bytes:
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(content)
+
+    def open(self, fileobj: any, mode: str = 'rb', level: int = None) -> any:
+        import zstandard
+
+        if mode == 'rb':
+            return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+
+        return zstandard.ZstdCompressor(level=3 if level is None else level) \
+                .stream_writer(fileobj, closefd=False)
+
+    def decompress(self, artifact: bytes) -> bytes:
+        with self.open(io.BytesIO(artifact)) as artifact_file:
+            return b''.join(iter(lambda: artifact_file.read(STREAM_CHUNK_BYTES), b''))
+
+class Lz4Codec(Codec):
+    """
+    LZ4 frames, the fastest to decompress. Requires lz4.
+    """
+    name = "lz4"
+    magic = b"\x04\x22\x4d\x18"
+
+    def compress(self, content: bytes, level: int = None) -> bytes:
+        import lz4.frame
+
+        return lz4.frame.compress(content, compression_level=level or 0)
+
+    def open(self, fileobj: any, mode: str = 'rb', level: int = None) -> any:
+        import lz4.frame
+
+        return lz4.frame.LZ4FrameFile(fileobj, mode=mode, compression_level=level or 0)
+
+    def decompress(self, artifact: bytes) -> bytes:
+        import lz4.frame
+
+        return lz4.frame.decompress(artifact)
+
+CODECS = {codec.name: codec for codec in [GzipCodec(), ZstdCodec(), Lz4Codec()]}
+
+def get_codec(codec_name: str) -> Codec:
+    """
+    Returns the Codec named codec_name, or None when codec_name is None.
+    """
+    if codec_name is None:
+        return None
+
+    if codec_name not in CODECS:
+        raise ValueError(f"unsupported compression codec '{codec_name}'")
+
+    return CODECS[codec_name]
+
+def detect_codec(artifact: bytes) -> Codec:
+    """
+    Returns the Codec that compressed artifact, or None when it is uncompressed.
+    """
+    for codec in CODECS.values():
+        if artifact[:len(codec.magic)] == codec.magic:
+            return codec
+
+    return None
+
+def open_artifact(artifact: bytes) -> any:
+    """
+    Returns a file object reading artifact, decompressed as it is read.
+    """
+    codec = detect_codec(artifact)
+    artifact_file = io.BytesIO(artifact)
+
+    return artifact_file if codec is None else codec.open(artifact_file)
+
+def decompress_artifact(artifact: bytes) -> bytes:
+    codec = detect_codec(artifact)
+
+    return artifact if codec is None else codec.decompress(artifact)
+
+def transcode_file(fpath: str, open_source: callable, open_target: callable) -> None:
+    temp_fpath = f"{fpath}.tmp"
+
+    with open(fpath, 'rb') as source_file, open(temp_fpath, 'wb') as target_file, \
+            open_source(source_file) as source_stream, \
+            open_target(target_file) as target_stream:
+        shutil.copyfileobj(source_stream, target_stream, STREAM_CHUNK_BYTES)
+
+    os.replace(temp_fpath, fpath)
+
+def compress_file(fpath: str, codec: Codec, level: int = None) -> None:
+    """
+    Compresses fpath in place, streaming it through codec.
+    """
+    transcode_file(fpath, lambda source_file: source_file,
+            lambda target_file: codec.open(target_file, 'wb', level))
+
+def decompress_file(fpath: str, codec: Codec) -> None:
+    transcode_file(fpath, codec.open, lambda target_file: target_file)
@@ -0,0 +1,17 @@
+class ConflictError(Exception):
+    """
+    Raised by a compare-and-swap write when a remote file no longer has the
+    expected version because another writer updated it first.
+    """
+    def __init__(self, remote_fpath: str):
+        super().__init__(f"remote file '{remote_fpath}' was modified concurrently")
+        self.remote_fpath = remote_fpath
+
+class ChecksumError(Exception):
+    """
+    Raised when downloaded content does not match the content hash it was stored
+    under, typically after a truncated or corrupted transfer.
+    """
+    def __init__(self, remote_fpath: str):
+        super().__init__(f"remote file '{remote_fpath}' failed checksum verification")
+        self.remote_fpath = remote_fpath
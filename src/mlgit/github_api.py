@@ -0,0 +1,280 @@
+import base64
+import http.client
+import io
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .errors import ChecksumError, ConflictError
+
+GITHUB_API_URL = "https://api.github.com"
+PUSH_ATTEMPTS = 8
+PUSH_BACKOFF = 0.1
+PUSH_CONCURRENCY = 8
+MAX_REDIRECTS = 5
+
+connection_pool = threading.local()
+
+def github_request(url: str, access_token: str = None, headers: dict = None,
+    method: str = "GET", data: bytes = None, timeout: float = 60) -> tuple:
+    """
+    Issues a request against the GitHub REST API and returns (status, headers, body).
+    304 Not Modified is returned as a regular response with an empty body, and
+    other error statuses raise urllib.error.HTTPError.
+    """
+    request_headers = {"Accept": "application/vnd.github+json"}
+    request_headers.update(headers or {})
+
+    if access_token is not None:
+        request_headers["Authorization"] = f"Bearer {access_token}"
+
+    for _ in range(MAX_REDIRECTS + 1):
+        status, reason, response_headers, body = send_pooled_request(url, method,
+                request_headers, data, timeout)
+
+        if status not in (301, 302, 303, 307, 308):
+            break
+
+        redirect_url = urllib.parse.urljoin(url, response_headers["Location"])
+
+        if urllib.parse.urlsplit(redirect_url).netloc != urllib.parse.urlsplit(url).netloc:
+            request_headers.pop("Authorization", None)
+
+        url = redirect_url
+
+    if status >= 400:
+        raise urllib.error.HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+
+    return status, response_headers, body
+
+def send_pooled_request(url: str, method: str, headers: dict, data: bytes,
+    timeout: float) -> tuple:
+    """
+    Sends a request over a kept-alive HTTPS connection to the host of url, reusing
+    one connection per host and thread across calls. Returns
+    (status, reason, headers, body).
+    """
+    split_url = urllib.parse.urlsplit(url)
+    request_path = split_url.path + (f"?{split_url.query}" if split_url.query else "")
+
+    if not hasattr(connection_pool, "connections"):
+        connection_pool.connections = {}
+
+    # A kept-alive connection may have been closed by the server since its last use
+    for attempt in range(2):
+        connection = connection_pool.connections.get(split_url.netloc)
+
+        if connection is None:
+            connection = http.client.HTTPSConnection(split_url.netloc, timeout=timeout)
+            connection_pool.connections[split_url.netloc] = connection
+
+        try:
+            connection.timeout = timeout
+            connection.request(method, request_path, body=data, headers=headers)
+            response = connection.getresponse()
+
+            return response.status, response.reason, response.headers, response.read()
+        except (http.client.HTTPException, OSError) as error:
+            connection.close()
+            del connection_pool.connections[split_url.netloc]
+
+            if attempt == 1:
+                raise urllib.error.URLError(error) from error
+
+def contents_url(user_name: str, repo_name: str, remote_path: str) -> str:
+    return f"{GITHUB_API_URL}/repos/{user_name}/{repo_name}/contents/" + \
+            urllib.parse.quote(remote_path)
+
+def read_remote_file_conditional(user_name: str, repo_name: str, remote_fpath: str,
+    etag: str = None, access_token: str = None, timeout: float = 60) -> tuple:
+    """
+    Returns (content, etag) for remote_fpath. When etag still matches the remote
+    blob the server answers 304 Not Modified, the body is never transferred and
+    content is returned as None.
+    """
+    headers = {"Accept": "application/vnd.github.raw"}
+
+    if etag is not None:
+        headers["If-None-Match"] = etag
+
+    status, response_headers, content = github_request(
+        contents_url(user_name, repo_name, remote_fpath), access_token,
+        headers, timeout=timeout
+    )
+
+    if status == 304:
+        return None, etag
+
+    return content, response_headers.get("ETag")
+
+def read_blob_sha(user_name: str, repo_name: str, remote_fpath: str, ref: str,
+    access_token: str = None, timeout: float = 60) -> str:
+    """
+    Returns the blob SHA of remote_fpath at ref, or None when it does not exist.
+    """
+    try:
+        return github_json_request(
+            contents_url(user_name, repo_name, remote_fpath) + f"?ref={ref}",
+            access_token, timeout=timeout
+        )["sha"]
+    except urllib.error.HTTPError as http_error:
+        if http_error.code == 404:
+            return None
+
+        raise
+
+def read_remote_blob(user_name: str, repo_name: str, remote_fpath: str,
+    access_token: str = None, timeout: float = 60) -> tuple:
+    """
+    Returns (content, blob_sha) for remote_fpath. Files above the 1 MB inline
+    limit of the contents API are fetched through the Git Data API.
+    """
+    entry = github_json_request(contents_url(user_name, repo_name, remote_fpath),
+            access_token, timeout=timeout)
+
+    if entry.get("encoding") != "base64":
+        entry = github_json_request(
+            f"{GITHUB_API_URL}/repos/{user_name}/{repo_name}/git/blobs/{entry['sha']}",
+            access_token, timeout=timeout
+        )
+
+    return base64.b64decode(entry["content"]), entry["sha"]
+
+def list_remote_directory(user_name: str, repo_name: str, remote_dpath: str,
+    access_token: str = None, timeout: float = 60) -> list:
+    """
+    Returns the paths of every file under remote_dpath, recursing into subdirectories.
+    """
+    _, _, body = github_request(contents_url(user_name, repo_name, remote_dpath),
+            access_token, timeout=timeout)
+
+    remote_fpaths = []
+
+    for entry in json.loads(body):
+        if entry["type"] == "dir":
+            remote_fpaths.extend(list_remote_directory(user_name, repo_name,
+                    entry["path"], access_token, timeout))
+        else:
+            remote_fpaths.append(entry["path"])
+
+    return remote_fpaths
+
+def list_remote_file_names(user_name: str, repo_name: str, remote_dpath: str,
+    access_token: str = None, timeout: float = 60) -> list:
+    """
+    Returns the names of the files directly in remote_dpath on the default branch
+    in a single Git Data API request, which unlike the contents API is not capped
+    at 1000 entries. Returns [] when remote_dpath does not exist.
+    """
+    repo_url = f"{GITHUB_API_URL}/repos/{user_name}/{repo_name}"
+    branch = github_json_request(repo_url, access_token, timeout=timeout)["default_branch"]
+
+    try:
+        tree = github_json_request(
+            f"{repo_url}/git/trees/{urllib.parse.quote(f'{branch}:{remote_dpath}', safe='/')}",
+            access_token, timeout=timeout
+        )
+    except urllib.error.HTTPError as http_error:
+        if http_error.code == 404:
+            return []
+
+        raise
+
+    return [entry["path"] for entry in tree["tree"] if entry["type"] == "blob"]
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code == 429 or error.code >= 500
+
+    return isinstance(error, (urllib.error.URLError, TimeoutError, ConnectionError,
+            ChecksumError))
+
+def call_with_retries(function: callable, retries: int = 3, backoff: float = 1,
+    on_retry: callable = None) -> any:
+    """
+    Calls function, retrying transient network errors up to retries times with
+    exponential backoff. on_retry is called with the error before each retry.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return function()
+        except Exception as error:
+            if attempt == retries or not is_retryable(error):
+                raise
+
+            if on_retry is not None:
+                on_retry(error)
+
+            time.sleep(backoff * 2 ** attempt)
+
+def github_json_request(url: str, access_token: str = None, method: str = "GET",
+    payload: dict = None, timeout: float = 60) -> any:
+    data = None if payload is None else json.dumps(payload).encode()
+    _, _, body = github_request(url, access_token,
+            {"Content-Type": "application/json"}, method, data, timeout)
+
+    return json.loads(body)
+
+def push_contents(user_name: str, repo_name: str, access_token: str, contents: dict,
+    message: str, expected_blob_shas: dict = None, timeout: float = 120) -> str:
+    """
+    Commits contents, a mapping of remote file paths to bytes-like objects, to the
+    default branch through the Git Data API as a single tree and commit. Returns
+    the commit SHA. The branch is never force-updated; when another writer moves
+    it in between, the commit is rebuilt on top of the new head.
+
+    expected_blob_shas maps remote file paths to the blob SHA they must still have
+    at the head the commit is built on (None: must not exist). ConflictError is
+    raised otherwise. Files mapped to None contents are deleted.
+    """
+    repo_url = f"{GITHUB_API_URL}/repos/{user_name}/{repo_name}"
+    branch = github_json_request(repo_url, access_token, timeout=timeout)["default_branch"]
+
+    def create_blob(remote_fpath: str) -> dict:
+        if contents[remote_fpath] is None: # Deleted from the base tree
+            return {"path": remote_fpath, "mode": "100644", "type": "blob", "sha": None}
+
+        blob = github_json_request(f"{repo_url}/git/blobs", access_token, "POST", {
+            "content": base64.b64encode(contents[remote_fpath]).decode(), "encoding": "base64"
+        }, timeout)
+
+        return {"path": remote_fpath, "mode": "100644", "type": "blob", "sha": blob["sha"]}
+
+    with ThreadPoolExecutor(max_workers=PUSH_CONCURRENCY) as executor:
+        tree_entries = list(executor.map(create_blob, contents))
+
+    for attempt in range(PUSH_ATTEMPTS):
+        head_sha = github_json_request(f"{repo_url}/git/ref/heads/{branch}",
+                access_token, timeout=timeout)["object"]["sha"]
+        base_tree_sha = github_json_request(f"{repo_url}/git/commits/{head_sha}",
+                access_token, timeout=timeout)["tree"]["sha"]
+
+        for remote_fpath, expected_blob_sha in (expected_blob_shas or {}).items():
+            if read_blob_sha(user_name, repo_name, remote_fpath, head_sha, access_token,
+                    timeout) != expected_blob_sha:
+                raise ConflictError(remote_fpath)
+
+        tree = github_json_request(f"{repo_url}/git/trees", access_token, "POST", {
+            "base_tree": base_tree_sha, "tree": tree_entries
+        }, timeout)
+
+        commit = github_json_request(f"{repo_url}/git/commits", access_token, "POST", {
+            "message": message, "tree": tree["sha"], "parents": [head_sha]
+        }, timeout)
+
+        try:
+            github_json_request(f"{repo_url}/git/refs/heads/{branch}", access_token,
+                    "PATCH", {"sha": commit["sha"], "force": False}, timeout)
+
+            return commit["sha"]
+        except urllib.error.HTTPError as http_error:
+            # 422: not a fast-forward, the branch moved since head_sha was read
+            if http_error.code != 422 or attempt == PUSH_ATTEMPTS - 1:
+                raise
+
+        time.sleep(random.uniform(0, PUSH_BACKOFF * 2 ** attempt))
@@ -0,0 +1,119 @@
+import contextlib
+import logging
+import threading
+import time
+
+from collections import defaultdict
+
+RECORD_COUNTERS = ["seconds", "bytes", "files", "retries", "cache_hits", "cache_misses"]
+
+class MetricsSink:
+    """
+    Receives a record of every instrumented MLGitClient operation
+        {"operation", "path", "seconds", "bytes", "files", "retries",
+         "cache_hits", "cache_misses", "error"}
+    where bytes counts bytes transferred to or from storage, and error is the
+    name of the exception raised by the operation, if any. Records may be
+    emitted from several threads at once.
+    """
+    def record(self, operation_record: dict) -> None:
+        raise NotImplementedError()
+
+class CallbackSink(MetricsSink):
+    def __init__(self, callback: callable):
+        self.callback = callback
+
+    def record(self, operation_record: dict) -> None:
+        self.callback(operation_record)
+
+class LoggingSink(MetricsSink):
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG):
+        self.logger = logging.getLogger("mlgit") if logger is None else logger
+        self.level = level
+
+    def record(self, operation_record: dict) -> None:
+        self.logger.log(self.level, "%s %s: %.3fs, %d bytes, %d files, %d retries, "
+                "%d cache hits, %d cache misses%s", operation_record["operation"],
+                operation_record["path"], *[operation_record[counter] for counter in RECORD_COUNTERS],
+                "" if operation_record["error"] is None else f", failed ({operation_record['error']})")
+
+class CounterSink(MetricsSink):
+    """
+    Accumulates Prometheus-style counters per operation
+        mlgit_operations_total, mlgit_errors_total and mlgit_<counter>_total
+    for every record counter, rendered in the text exposition format by render.
+    """
+    def __init__(self):
+        self.counters = defaultdict(float) # (counter_name, operation) -> total
+        self.lock = threading.Lock()
+
+    def record(self, operation_record: dict) -> None:
+        operation = operation_record["operation"]
+
+        with self.lock:
+            self.counters[("mlgit_operations_total", operation)] += 1
+            self.counters[("mlgit_errors_total", operation)] += \
+                    operation_record["error"] is not None
+
+            for counter in RECORD_COUNTERS:
+                self.counters[(f"mlgit_{counter}_total", operation)] += operation_record[counter]
+
+    def get(self, counter_name: str, operation: str) -> float:
+        with self.lock:
+            return self.counters.get((counter_name, operation), 0)
+
+    def render(self) -> str:
+        with self.lock:
+            counters = sorted(self.counters.items())
+
+        lines = []
+
+        for (counter_name, operation), total in counters:
+            if len(lines) == 0 or not lines[-1].startswith(counter_name + '{'):
+                lines.append(f"# TYPE {counter_name} counter")
+
+            lines.append(f'{counter_name}{{operation="{operation}"}} {total:g}')
+
+        return '\n'.join(lines) + '\n'
+
+def task_record() -> dict:
+    """
+    Returns the counters of one of the concurrent tasks of an operation. Tasks
+    never share a record; merge_task_records adds them up once the tasks ended.
+    """
+    return {counter: 0 for counter in RECORD_COUNTERS if counter != "seconds"}
+
+def merge_task_records(operation_record: dict, task_records: list) -> None:
+    for record in task_records:
+        for counter, value in record.items():
+            operation_record[counter] += value
+
+def retry_counter(operation_record: dict) -> callable:
+    """
+    Returns an on_retry callback for call_with_retries counting into operation_record.
+    """
+    def count_retry(error: Exception) -> None:
+        operation_record["retries"] += 1
+
+    return count_retry
+
+@contextlib.contextmanager
+def instrument(metrics_sink: MetricsSink, operation: str, path: str = None) -> dict:
+    """
+    Times the enclosed block and emits its record to metrics_sink, if any. The
+    block fills in the other counters of the record it is given.
+    """
+    operation_record = {"operation": operation, "path": path, "error": None,
+            **{counter: 0 for counter in RECORD_COUNTERS}}
+    start_time = time.perf_counter()
+
+    try:
+        yield operation_record
+    except BaseException as error:
+        operation_record["error"] = type(error).__name__
+        raise
+    finally:
+        operation_record["seconds"] = time.perf_counter() - start_time
+
+        if metrics_sink is not None:
+            metrics_sink.record(operation_record)
@@ -1,28 +1,258 @@
+import contextlib
+import copy
 import datetime
+import functools
+import itertools
 import json
+import logging
 import shutil
 import os
+import posixpath
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 
 import pandas as pd
 
-from pyutils.pickable import PickableObject
-from pyutils.git import *
+from .artifact_cache import ArtifactCache
+from .github_api import call_with_retries
+from .backtest import filter_backtest, merge_backtests, overlaps_backtest_range
+from .chunks import OBJECTS_DNAME, VERSION_OBJECTS_FNAME, chunk_offsets, content_hash, \
+        make_chunks_manifest, validate_chunk_bytes
+from .compression import Codec, get_codec, open_artifact
+from .errors import ChecksumError, ConflictError
+from .metrics import MetricsSink, instrument, merge_task_records, retry_counter, task_record
+from .mmap_cache import MmapModelCache
+from .model_cache import ModelCache
+from .model_serializers import get_model_serializer, read_model_metadata, restore_model, \
+        save_model
+from .pandas_formats import PANDAS_FORMATS, has_pandas_format, split_pandas_format
+from .storage import GitHubStorage, Storage, is_not_found, walk_local_directory
+
+BACKTEST_SEGMENTS_DNAME = "backtest_segments"
+VERSION_SEGMENTS_DNAME = "version_segments"
+VERSION_SEGMENT_SIZE = 64
+REGISTRY_MANIFEST_FNAME = "manifest.json"
+PARSED_ARTIFACTS_MAX_ENTRIES = 64
+UPDATE_ATTEMPTS = 8
+UPDATE_BACKOFF = 0.1
+UNCHANGED = object() # Returned by JSON artifact updates leaving their file as is
+PREFETCH_WORKERS = 2
+
+logger = logging.getLogger("mlgit")
+
+def select_backtest_columns(model_backtest: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+    return model_backtest if columns is None else model_backtest[list(columns)]
+
+def read_local_file(local_fpath: str) -> bytes:
+    with open(local_fpath, 'rb') as local_file:
+        return local_file.read()
+
+def version_entry(model_version: any) -> dict:
+    # Versions logged by clients that did not record entries only have a name
+    return model_version if isinstance(model_version, dict) else {"version": model_version}
+
+def merge_version_entries(model_versions: list, version_entries: list) -> list:
+    # versions.json lists every version, version_entries.json the entries of those
+    # logged with one (not those logged by clients predating it)
+    logged_entries = {logged_entry["version"]: logged_entry for logged_entry in version_entries}
+
+    return [
+        logged_entries.get(model_version, version_entry(model_version))
+        for model_version in model_versions
+    ]
+
+def empty_version_head() -> dict:
+    return {"count": 0, "latest": None, "segment_size": VERSION_SEGMENT_SIZE, "tail": []}
+
+def parse_json_artifact(artifact: bytes) -> any:
+    return json.load(open_artifact(artifact))
+
+def common_remote_path(remote_paths: list) -> str:
+    return posixpath.commonpath(remote_paths) if len(remote_paths) > 0 else None
+
+def directory_size(local_dpath: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(dpath, fname))
+        for dpath, _, fnames in os.walk(local_dpath) for fname in fnames
+    )
 
 class MLGitClient:
     """
     Repository Architecture
         - registry_dpath
+            - manifest.json (models with their latest version, version count and timestamp)
+            - objects (content-addressed files and chunks, named by their SHA-256)
             - model_name
                 - model_artifacts *
+                - versions.json
+                - version_entries.json (entries of the versions in versions.json)
+                - version_segments (head and directory, when segment_versions)
                 - backtest
+                - backtest_segments (index and directory, when segment_backtests)
                 - model_versions *
                     - model
+                    - .objects.json (files kept in objects)
                     - model_version_artifacts *
+
+    Remote operations go through storage, a GitHubStorage on user_name/repo_name
+    by default, or any other Storage backend such as LocalStorage or
+    BareGitStorage (user_name and repo_name are then unused).
+
+    Remote reads go through an optional on-disk ArtifactCache when cache_dpath is
+    given. Entries older than cache_max_age seconds are revalidated with a
+    conditional (If-None-Match) request, and entries are invalidated whenever this
+    client logs to the same remote path. read_access_token authenticates GitHub
+    reads; GitHub does not count 304 answers against the rate limit.
+
+    Model version directories are downloaded with up to download_concurrency
+    files in flight, each retried up to download_retries times, on thread pools
+    kept until close so that their storage connections are reused. Restored models
+    are kept in an in-memory ModelCache when model_cache_entries or
+    model_cache_bytes is given; cached models are shared between callers.
+
+    With segment_backtests, log_model_backtest writes each backtest as an
+    immutable segment instead of rewriting the whole backtest, and
+    get_model_backtest merges the segments on read until compact_backtest folds
+    them back into a single artifact. Readers and writers of a model must agree
+    on segment_backtests.
+
+    With segment_versions, the version list is kept as a small head holding the
+    version count, the latest version and the newest versions, and immutable
+    segments of VERSION_SEGMENT_SIZE older versions, instead of a versions.json
+    rewritten in full on every logged version. get_latest_version,
+    get_version_count, get_versions_page and iter_versions then only read the
+    head and the segments they need. Readers and writers detect the layout of
+    each model: once a model has a head, every client appends to it, and the
+    first segmented write of a model moves its versions.json over.
+
+    Either layout keeps the entry of every version, with its timestamp,
+    serializer, codec and artifact sizes (see iter_version_entries): in the head
+    and segments, or in a version_entries.json written with versions.json, which
+    keeps listing version names only for older readers.
+
+    Pandas artifacts, including the backtest, are written as pandas_format
+    ("csv" or "parquet"). An extension on an artifact name selects its format
+    explicitly. Artifacts named without one are looked up in pandas_format, then
+    in the other formats, and the backtest is written back in the format it was
+    found in, so clients with different pandas_format share models.
+
+    The version list, the registry manifest and the backtest segment index are
+    each updated by compare-and-swap against the version of the file that was
+    read, and re-read and re-merged when another writer got in first, so trainers
+    can log versions of the same model concurrently. A version is published by
+    its version list; the manifest is updated in a separate write that retries
+    until it succeeds, so trainers of unrelated models never fail each other.
+
+    With model_chunk_bytes, model files are uploaded as chunks of that size to the
+    objects directory, with up to download_concurrency chunks in flight. With
+    dedup_artifacts, every other file of a model version is kept in objects as
+    well. The version directory then lists those files in its .objects.json.
+    Objects already present are not uploaded again, which skips files unchanged
+    from earlier versions and lets a failed upload resume where it stopped.
+    Downloaded objects are verified against their hash, kept in the artifact
+    cache without revalidation, and written straight into place. Versions are
+    read the same way whatever the settings of the client that logged them.
+
+    With content_defined_chunks, model chunks are cut where the content matches
+    rather than at fixed offsets, model_chunk_bytes (CDC_MIN_CHUNK_BYTES or more)
+    long on average. A change to part of the model then only changes the chunks
+    around it, so later versions upload only those, and reads reuse the other
+    chunks from the artifact cache.
+
+    With mmap_cache_dpath, restored models are also kept in an MmapModelCache
+    there, with buffers of mmap_min_bytes or more (numpy array data) stored out
+    of band. Models are then loaded by memory-mapping those buffers read-only,
+    so every process on the host shares a single copy of the weights, and
+    only one process restores a model missing from the cache. With
+    mmap_cache_bytes, the least recently loaded models are evicted from it once
+    it grows beyond that size.
+
+    prefetch pulls and restores model versions into those caches in the
+    background, and track_latest keeps prefetching the latest version of a
+    model as it is logged, so that get_model_version returns it at once.
+
+    Models are logged with model_serializer ("pickable", "pickle5", "joblib",
+    "cloudpickle" or "tensors", see model_serializers), unless log_model_version
+    is given another. The serializer is recorded in the .model.json of the version
+    and in its version entry, and get_model_version restores each version
+    with the serializer it was logged with.
+
+    With compression ("gzip", "zstd" or "lz4"), JSON and pandas artifacts and
+    model files are compressed at compression_level (default: that of the codec)
+    before upload. Version lists, the registry manifest and other index files
+    are left uncompressed. Readers detect the codec of an artifact from the
+    magic bytes of its frames, whatever the settings of the client that logged
+    it, and decompress CSV artifacts as they are parsed. The codec of model files
+    is recorded with their serializer. Model files kept in objects (with
+    model_chunk_bytes or dedup_artifacts) are left uncompressed: a change to part
+    of a compressed stream changes everything after it, so no chunk would be
+    shared with earlier versions.
+
+    metrics_sink receives a record of every storage read and write, directory
+    and object pull, parse, (de)serialization and backtest merge, with its wall
+    time, bytes transferred, files, retries and cache hits and misses.
     """
-    def __init__(self, user_name: str, repo_name: str, registry_dpath: str = None):
+    def __init__(self, user_name: str, repo_name: str, registry_dpath: str = None,
+        cache_dpath: str = None, cache_max_bytes: int = 2 ** 30,
+        cache_max_age: float = 60, read_access_token: str = None,
+        download_concurrency: int = 8, download_retries: int = 3,
+        model_cache_entries: int = None, model_cache_bytes: int = None,
+        segment_backtests: bool = False, pandas_format: str = "csv",
+        segment_versions: bool = False,
+        storage: Storage = None, model_chunk_bytes: int = None,
+        dedup_artifacts: bool = False, content_defined_chunks: bool = False,
+        mmap_cache_dpath: str = None, mmap_min_bytes: int = 2 ** 16,
+        mmap_cache_bytes: int = None, metrics_sink: MetricsSink = None,
+        model_serializer: any = "pickable", compression: str = None,
+        compression_level: int = None):
         self.user_name = user_name
         self.repo_name = repo_name
         self.registry_dpath = registry_dpath
+        self.storage = GitHubStorage(user_name, repo_name, read_access_token) \
+                if storage is None else storage
+        self.artifact_cache = None if cache_dpath is None else \
+                ArtifactCache(cache_dpath, cache_max_bytes, cache_max_age)
+        self.parsed_artifacts = OrderedDict() # (remote_fpath, parse_key) -> (revision, artifact)
+        self.parsed_artifacts_lock = threading.Lock()
+        self.pandas_artifact_formats = {} # (model_name, model_version, artifact_name) -> extension
+        self.download_concurrency = download_concurrency
+        self.download_retries = download_retries
+        self.model_cache = None if model_cache_entries is None and model_cache_bytes is None \
+                else ModelCache(model_cache_entries, model_cache_bytes)
+        self.batch_state = threading.local() # batch_logging stages per thread
+        self.segment_backtests = segment_backtests
+        self.segment_versions = segment_versions
+        self.pandas_format = pandas_format
+        validate_chunk_bytes(model_chunk_bytes, content_defined_chunks)
+        self.model_chunk_bytes = model_chunk_bytes
+        self.dedup_artifacts = dedup_artifacts
+        self.content_defined_chunks = content_defined_chunks
+        self.mmap_cache = None if mmap_cache_dpath is None else \
+                MmapModelCache(mmap_cache_dpath, mmap_min_bytes, mmap_cache_bytes)
+        self.prefetch_lock = threading.Lock()
+        self.prefetch_executor = None
+        self.executors = {} # (purpose, max_workers) -> ThreadPoolExecutor
+        self.executors_lock = threading.Lock()
+        self.prefetch_futures = {} # (model_name, model_version) -> Future of the model
+        self.trackers = {} # model_name -> threading.Event stopping its tracker
+        self.metrics_sink = metrics_sink
+        self.model_serializer = get_model_serializer(model_serializer)
+        self.codec = get_codec(compression)
+        self.compression_level = compression_level
+
+    @property
+    def batch_uploads(self) -> dict:
+        return getattr(self.batch_state, "uploads", None)
+
+    @batch_uploads.setter
+    def batch_uploads(self, batch_uploads: dict) -> None:
+        self.batch_state.uploads = batch_uploads
 
     def model_remote_path(self, model_name: str, model_version: str = None,
         artifact_name: str = None) -> str:
@@ -32,92 +262,1171 @@ class MLGitClient:
             if path_component is not None
         ])
 
+    def instrument(self, operation: str, path: str = None) -> contextlib.AbstractContextManager:
+        return instrument(self.metrics_sink, operation, path)
+
+    def artifact_cache_key(self, remote_fpath: str) -> str:
+        return '/'.join([self.storage.name, remote_fpath])
+
+    def read_remote_artifact(self, remote_fpath: str) -> bytes:
+        return self.fetch_remote_artifact(remote_fpath)[0]
+
+    def fetch_remote_artifact(self, remote_fpath: str, known_revision: str = None) -> tuple:
+        """
+        Returns (artifact, revision) for remote_fpath, where revision is the remote
+        ETag when caching is enabled. Stale cache entries are revalidated with a
+        conditional request, and artifact is None when the artifact is unchanged
+        from known_revision.
+        """
+        if self.batch_uploads is not None and remote_fpath in self.batch_uploads:
+            return bytes(self.batch_uploads[remote_fpath]), None # Staged within batch_logging
+
+        with self.instrument("read_artifact", remote_fpath) as operation_record:
+            return self.fetch_cached_artifact(remote_fpath, known_revision, operation_record)
+
+    def fetch_cached_artifact(self, remote_fpath: str, known_revision: str,
+        operation_record: dict) -> tuple:
+        if self.artifact_cache is None:
+            artifact = self.read_storage_file(remote_fpath)[0]
+            operation_record["bytes"] += len(artifact)
+
+            return artifact, None
+
+        cache_key = self.artifact_cache_key(remote_fpath)
+        metadata = self.artifact_cache.get_metadata(cache_key)
+        revision = None if metadata is None else metadata.get("revision")
+
+        if metadata is None or not self.artifact_cache.is_fresh(metadata):
+            artifact, revision = self.read_storage_file(remote_fpath, revision)
+
+            if artifact is not None:
+                operation_record["cache_misses"] += 1
+                operation_record["bytes"] += len(artifact)
+                self.artifact_cache.put(cache_key, artifact, revision)
+
+                return artifact, revision
+
+            self.artifact_cache.refresh(cache_key) # Not modified
+
+        if revision is not None and revision == known_revision:
+            operation_record["cache_hits"] += 1
+            return None, revision
+
+        # The contents stored with the revision above, even if the entry was replaced since
+        artifact = self.artifact_cache.read_content(cache_key, metadata)
+
+        if artifact is None: # Evicted or replaced since the metadata was read
+            self.artifact_cache.invalidate(cache_key, metadata)
+            return self.fetch_cached_artifact(remote_fpath, known_revision, operation_record)
+
+        operation_record["cache_hits"] += 1
+        return artifact, revision
+
+    def read_storage_file(self, remote_fpath: str, etag: str = None) -> tuple:
+        """
+        Reads remote_fpath from storage, or from objects when it is a file of a
+        model version kept there. The etag of such a file is the hash of its chunks.
+        """
+        try:
+            return self.storage.read_file(remote_fpath, etag)
+        except Exception as error:
+            chunks_manifest = self.find_version_object(remote_fpath) \
+                    if is_not_found(error) else None
+
+            if chunks_manifest is None:
+                raise
+
+        object_etag = content_hash(json.dumps(chunks_manifest["chunks"]).encode())
+
+        if object_etag == etag:
+            return None, etag
+
+        return self.read_objects(chunks_manifest), object_etag
+
+    def find_version_object(self, remote_fpath: str) -> dict:
+        """
+        Returns the chunks manifest of remote_fpath from the .objects.json of its
+        model version directory, or None when it is not kept in objects.
+        """
+        registry_prefix = "" if self.registry_dpath is None else f"{self.registry_dpath}/"
+
+        if not remote_fpath.startswith(registry_prefix):
+            return None
+
+        path_components = remote_fpath[len(registry_prefix):].split('/', 2)
+
+        if len(path_components) < 3 or path_components[2] == VERSION_OBJECTS_FNAME:
+            return None
+
+        model_name, model_version, artifact_path = path_components
+
+        try:
+            version_objects = self.load_remote_artifact(
+                self.model_remote_path(model_name, model_version, VERSION_OBJECTS_FNAME),
+                json.loads
+            )
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
+            return None
+
+        return version_objects.get(artifact_path)
+
+    def load_remote_artifact(self, remote_fpath: str, parse: callable,
+        parse_key: str = None) -> any:
+        """
+        Returns parse(artifact) for remote_fpath, reusing the previously parsed
+        object while the remote revision is unchanged.
+        """
+        memo_key = (remote_fpath, parse_key)
+
+        with self.parsed_artifacts_lock:
+            known_revision, parsed_artifact = self.parsed_artifacts.get(memo_key, (None, None))
+
+        artifact, revision = self.fetch_remote_artifact(remote_fpath, known_revision)
+
+        if artifact is None:
+            return copy.deepcopy(parsed_artifact)
+
+        with self.instrument("parse_artifact", remote_fpath):
+            parsed_artifact = parse(artifact)
+
+        if revision is not None:
+            with self.parsed_artifacts_lock:
+                self.parsed_artifacts[memo_key] = (revision, parsed_artifact)
+                self.parsed_artifacts.move_to_end(memo_key)
+
+                if len(self.parsed_artifacts) > PARSED_ARTIFACTS_MAX_ENTRIES:
+                    self.parsed_artifacts.popitem(last=False)
+
+            return copy.deepcopy(parsed_artifact)
+
+        return parsed_artifact
+
+    def registry_remote_path(self, artifact_name: str) -> str:
+        return self.model_remote_path(None, None, artifact_name)
+
+    def get_registry_manifest(self) -> dict:
+        """
+        Returns the registry manifest
+            {"models": {model_name: {"latest", "count", "timestamp"}}}
+        kept up to date by register_model and log_model_version_from_local, where
+        timestamp is when the latest version was logged. The entries of every
+        version are kept with the version list of each model, in either layout,
+        see iter_version_entries.
+        """
+        try:
+            return self.load_remote_artifact(
+                self.registry_remote_path(REGISTRY_MANIFEST_FNAME), parse_json_artifact
+            )
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
+            return {"models": {}}
+
+    def list_models(self) -> list:
+        return list(self.get_registry_manifest()["models"])
+
     def get_version_list(self, model_name: str) -> list:
-        return self.get_json_artifact("versions", model_name)
+        return list(self.iter_versions(model_name))
+
+    def get_version_head(self, model_name: str) -> dict:
+        """
+        Returns the version head
+            {"count", "latest", "segment_size", "tail": [version_entry]}
+        of a model logged with segment_versions, where tail lists the entries of
+        the versions after the last full segment, or None for models keeping a
+        versions.json.
+        """
+        try:
+            return self.get_json_artifact(VERSION_SEGMENTS_DNAME, model_name)
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
+            return None
+
+    def get_version_segment(self, model_name: str, segment_idx: int) -> list:
+        return [
+            version_entry(model_version) for model_version in
+            self.get_json_artifact(str(segment_idx), model_name, VERSION_SEGMENTS_DNAME)
+        ]
+
+    def get_legacy_version_entries(self, model_name: str) -> list:
+        try:
+            version_entries = self.get_json_artifact("version_entries", model_name)
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
+            version_entries = []
+
+        return merge_version_entries(self.get_json_artifact("versions", model_name),
+                version_entries)
+
+    def get_latest_version(self, model_name: str) -> str:
+        """
+        Returns the latest version of model_name, or None when it has none.
+        """
+        version_head = self.get_version_head(model_name)
+
+        if version_head is None:
+            model_versions = self.get_json_artifact("versions", model_name)
+            return model_versions[-1] if len(model_versions) > 0 else None
+
+        return version_head["latest"]
+
+    def get_version_count(self, model_name: str) -> int:
+        version_head = self.get_version_head(model_name)
+
+        return len(self.get_json_artifact("versions", model_name)) \
+                if version_head is None else version_head["count"]
+
+    def get_versions_page(self, model_name: str, offset: int = 0, limit: int = 100) -> list:
+        """
+        Returns the versions of model_name logged in positions [offset, offset + limit),
+        oldest first, reading only the segments they fall in.
+        """
+        return [
+            version_entry["version"] for version_entry in
+            self.get_version_entries_page(model_name, offset, limit)
+        ]
+
+    def get_version_entries_page(self, model_name: str, offset: int = 0,
+        limit: int = 100) -> list:
+        """
+        Returns the entries of the versions of model_name logged in positions
+        [offset, offset + limit), as listed by iter_version_entries.
+        """
+        version_head = self.get_version_head(model_name)
+
+        if version_head is None:
+            return self.get_legacy_version_entries(model_name)[offset:offset + limit]
+
+        segment_size = version_head["segment_size"]
+        tail_offset = version_head["count"] - len(version_head["tail"])
+        stop = min(offset + limit, version_head["count"])
+        version_entries = []
+
+        for segment_idx in range(offset // segment_size,
+                -(-min(stop, tail_offset) // segment_size)):
+            version_entries.extend(self.get_version_segment(model_name, segment_idx))
+
+        version_entries = version_entries[offset % segment_size:] \
+                if len(version_entries) > 0 else []
+        version_entries.extend(version_entry(model_version) for model_version in
+                version_head["tail"][max(offset - tail_offset, 0):])
+
+        return version_entries[:max(stop - offset, 0)]
+
+    def iter_versions(self, model_name: str, since: str = None) -> iter:
+        for version_entry in self.iter_version_entries(model_name, since):
+            yield version_entry["version"]
+
+    def iter_version_entries(self, model_name: str, since: str = None) -> iter:
+        """
+        Yields the entries of the versions of model_name oldest first
+            {"version", "timestamp", "serializer", "codec",
+             "artifacts": {artifact_path: size}}
+        reading segments as they are consumed. Versions logged by clients that
+        did not record entries only have a "version". With since, only the versions logged after the
+        version since are yielded, and segments are read back from the newest
+        until since is found. Raises ValueError when since is not a version of
+        model_name.
+        """
+        version_head = self.get_version_head(model_name)
+
+        if version_head is None:
+            version_entries = self.get_legacy_version_entries(model_name)
+            yield from version_entries[self.version_position(version_entries, since):]
+            return
+
+        tail_entries = [version_entry(model_version) for model_version in version_head["tail"]]
+        nsegments = (version_head["count"] - len(tail_entries)) // version_head["segment_size"]
+
+        if since is None:
+            for segment_idx in range(nsegments):
+                yield from self.get_version_segment(model_name, segment_idx)
+
+            yield from tail_entries
+            return
+
+        version_entries = tail_entries
+        segment_idx = nsegments
+
+        while all(version_entry["version"] != since for version_entry in version_entries) \
+                and segment_idx > 0:
+            segment_idx -= 1
+            version_entries = self.get_version_segment(model_name, segment_idx) + \
+                    version_entries
+
+        yield from version_entries[self.version_position(version_entries, since):]
+
+    @staticmethod
+    def version_position(version_entries: list, since: str = None) -> int:
+        if since is None:
+            return 0
+
+        model_versions = [version_entry["version"] for version_entry in version_entries]
+
+        if since not in model_versions:
+            raise ValueError(f"unknown model version '{since}'")
+
+        return len(model_versions) - model_versions[::-1].index(since)
 
     def get_json_artifact(self, artifact_name: str, model_name: str,
         model_version: any = None) -> any:
         remote_artifact_fpath = self.model_remote_path(model_name, model_version,
                 f"{artifact_name}.json")
 
-        return json.loads(
-            read_remote_file(self.user_name, self.repo_name, remote_artifact_fpath)
-        )
+        return self.load_remote_artifact(remote_artifact_fpath, parse_json_artifact)
 
     def get_pandas_artifact(self, artifact_name: str, model_name: str,
-        model_version: str = None, **read_csv_kwargs) -> pd.DataFrame:
-        remote_artifact_fpath = self.model_remote_path(model_name, model_version,
-                f"{artifact_name}.csv")
-        
-        return read_remote_csv(self.user_name, self.repo_name, remote_artifact_fpath,
-                **read_csv_kwargs)
-
-    def get_model_backtest(self, model_name: str) -> pd.DataFrame:
-        model_backtest = self.get_pandas_artifact("backtest", model_name)
-        
-        index_name = model_backtest.columns[0]
-        model_backtest[index_name] = pd.to_datetime(model_backtest[index_name])
-        model_backtest["version_timestamp"] = pd.to_datetime(model_backtest["version_timestamp"])
-        model_backtest = model_backtest.set_index(index_name)
+        model_version: str = None, columns: list = None, **read_kwargs) -> pd.DataFrame:
+        """
+        Reads a pandas artifact in the format given by the extension of artifact_name
+        ("backtest.parquet"), or in the client's pandas_format when it has none.
+        Only the given columns are decoded when columns is not None.
+        """
+        return self.load_pandas_artifact(
+            artifact_name, model_name, model_version,
+            lambda pandas_format, artifact: pandas_format.read(artifact, columns, **read_kwargs),
+            repr((columns, sorted(read_kwargs.items())))
+        )
+
+    def load_pandas_artifact(self, artifact_name: str, model_name: str,
+        model_version: str, read: callable, parse_key: str = None) -> any:
+        """
+        Returns read(pandas_format, artifact) for a pandas artifact, trying each of
+        pandas_artifact_remote_paths in turn while the artifact is not found.
+        """
+        remote_artifact_paths = self.pandas_artifact_remote_paths(artifact_name, model_name,
+                model_version)
+
+        for path_idx, (remote_artifact_fpath, pandas_format) in \
+                enumerate(remote_artifact_paths):
+            try:
+                pandas_artifact = self.load_remote_artifact(remote_artifact_fpath,
+                        lambda artifact: read(pandas_format, artifact), parse_key)
+            except Exception as error:
+                if not is_not_found(error) or path_idx == len(remote_artifact_paths) - 1:
+                    raise
+
+                continue
+
+            if not has_pandas_format(artifact_name):
+                self.pandas_artifact_formats[(model_name, model_version, artifact_name)] = \
+                        pandas_format.extension
+
+            return pandas_artifact
+
+    def pandas_artifact_remote_path(self, artifact_name: str, model_name: str,
+        model_version: str = None) -> tuple:
+        """
+        Returns (remote_fpath, PandasFormat) of a pandas artifact: in the format given
+        by the extension of artifact_name, else in the format it was last found in
+        by this client, else in pandas_format.
+        """
+        return self.pandas_artifact_remote_paths(artifact_name, model_name, model_version)[0]
+
+    def pandas_artifact_remote_paths(self, artifact_name: str, model_name: str,
+        model_version: str = None) -> list:
+        """
+        Returns [(remote_fpath, PandasFormat)] of a pandas artifact, starting with
+        pandas_artifact_remote_path and followed by the other known formats when
+        artifact_name has no extension, as models may have been logged by clients
+        with another pandas_format.
+        """
+        if has_pandas_format(artifact_name):
+            artifact_name, pandas_format = split_pandas_format(artifact_name)
+            pandas_formats = [pandas_format]
+        else:
+            _, pandas_format = split_pandas_format(artifact_name, self.pandas_format)
+            known_format = self.pandas_artifact_formats.get(
+                    (model_name, model_version, artifact_name))
+            pandas_formats = list(dict.fromkeys(
+                ([] if known_format is None else [PANDAS_FORMATS[known_format]]) +
+                [pandas_format] + list(PANDAS_FORMATS.values())
+            ))
+
+        return [
+            (self.model_remote_path(model_name, model_version,
+                    f"{artifact_name}.{pandas_format.extension}"), pandas_format)
+            for pandas_format in pandas_formats
+        ]
+
+    def get_model_backtest(self, model_name: str, start: any = None, end: any = None,
+        columns: list = None, version_timestamp: any = None) -> pd.DataFrame:
+        """
+        Returns the rows of the backtest dated within [start, end], restricted to
+        the given columns and to the rows logged at version_timestamp. The filters
+        are pushed down to the reads: Parquet backtests only decode matching row
+        groups and columns, and segments outside [start, end] are never fetched.
+        """
+        if not self.segment_backtests:
+            return select_backtest_columns(
+                self.get_backtest_artifact("backtest", model_name, None, start, end,
+                        columns, version_timestamp),
+                columns
+            )
+
+        # A segment compacted and deleted since the segment index was read is
+        # found in the compacted backtest by reading both again
+        for attempt in range(UPDATE_ATTEMPTS):
+            backtest_segments = self.get_backtest_segments(model_name)
+
+            try:
+                model_backtest = self.get_backtest_artifact("backtest", model_name, None,
+                        start, end, columns)
+            except Exception as error:
+                if not is_not_found(error) or len(backtest_segments) == 0:
+                    raise
+
+                model_backtest = None
+
+            try:
+                model_backtest = self.merge_backtest_segments(model_name, model_backtest,
+                        backtest_segments, start, end, columns)
+                break
+            except Exception as error:
+                if not is_not_found(error) or attempt == UPDATE_ATTEMPTS - 1:
+                    raise
+
+        return select_backtest_columns(
+            filter_backtest(model_backtest, version_timestamp=version_timestamp),
+            columns
+        )
+
+    def merge_backtest_segments(self, model_name: str, model_backtest: pd.DataFrame,
+        backtest_segments: list, start: any = None, end: any = None,
+        columns: list = None) -> pd.DataFrame:
+        """
+        Merges backtest_segments of model_name into model_backtest (None when there
+        is no compacted backtest), keeping the rows within [start, end].
+        """
+        # Segments are merged in logging order under the usual precedence rules.
+        # Precedence is resolved per date, so segments outside [start, end] can be
+        # skipped; the last segment is still read when nothing else was.
+        for segment_idx, backtest_segment in enumerate(backtest_segments):
+            if not overlaps_backtest_range(backtest_segment, start, end) and \
+                    (model_backtest is not None or segment_idx < len(backtest_segments) - 1):
+                continue
+
+            segment_backtest = self.get_backtest_artifact(backtest_segment["name"],
+                    model_name, BACKTEST_SEGMENTS_DNAME, start, end, columns)
+
+            if model_backtest is None:
+                model_backtest = segment_backtest
+                continue
+
+            with self.instrument("merge_backtest", model_name):
+                model_backtest = merge_backtests(model_backtest, segment_backtest,
+                        pd.Timestamp(backtest_segment["version_timestamp"]))
 
         return model_backtest
 
+    def get_backtest_artifact(self, artifact_name: str, model_name: str,
+        model_version: str = None, start: any = None, end: any = None,
+        columns: list = None, version_timestamp: any = None) -> pd.DataFrame:
+        return self.load_pandas_artifact(
+            artifact_name, model_name, model_version,
+            lambda pandas_format, artifact: pandas_format.read_backtest(artifact, start,
+                    end, columns, version_timestamp),
+            repr(("backtest", start, end, columns, version_timestamp))
+        )
+
+    def get_backtest_segments(self, model_name: str) -> list:
+        try:
+            return self.get_json_artifact(BACKTEST_SEGMENTS_DNAME, model_name)
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
+            return []
+
+    def get_many_version_lists(self, model_names: list, stream: bool = False,
+        max_workers: int = None) -> any:
+        return self.get_many(self.get_version_list, model_names, stream, max_workers)
+
+    def get_many_backtests(self, model_names: list, stream: bool = False,
+        max_workers: int = None, **backtest_kwargs) -> any:
+        return self.get_many(self.get_model_backtest, model_names, stream, max_workers,
+                **backtest_kwargs)
+
+    def get_many(self, get_function: callable, model_names: list, stream: bool = False,
+        max_workers: int = None, **get_kwargs) -> any:
+        """
+        Calls get_function(model_name, **get_kwargs) once per distinct model name,
+        with up to max_workers (default download_concurrency) calls in flight.
+        Returns {model_name: result}, or when stream is set, an iterator of
+        (model_name, result) pairs in completion order.
+        """
+        results = self.iter_many(get_function, model_names, max_workers, **get_kwargs)
+        return results if stream else dict(results)
+
+    def iter_many(self, get_function: callable, model_names: list, max_workers: int = None,
+        **get_kwargs) -> iter:
+        executor = self.executor("get_many", max_workers or self.download_concurrency)
+        futures = {
+            executor.submit(get_function, model_name, **get_kwargs): model_name
+            for model_name in dict.fromkeys(model_names)
+        }
+
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally: # Stop pending calls when the consumer stops early or a call fails
+            for future in futures:
+                future.cancel()
+
+    def executor(self, purpose: str, max_workers: int) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool of purpose with max_workers threads, created once
+        and kept until close, so that the storage connections its threads keep are
+        reused across calls. Tasks never wait on tasks of their own pool: get_many
+        calls run on "get_many" and the file transfers they make on "transfer".
+        """
+        with self.executors_lock:
+            if (purpose, max_workers) not in self.executors:
+                self.executors[(purpose, max_workers)] = ThreadPoolExecutor(
+                        max_workers=max_workers, thread_name_prefix=f"mlgit_{purpose}")
+
+            return self.executors[(purpose, max_workers)]
+
+    def map_transfers(self, transfer: callable, *iterables) -> list:
+        """
+        Calls transfer over iterables on the "transfer" pool, download_concurrency
+        calls at a time, and returns their results once every call has ended,
+        raising the first error after cancelling the calls not started.
+        """
+        futures = [
+            self.executor("transfer", self.download_concurrency).submit(transfer, *args)
+            for args in zip(*iterables)
+        ]
+
+        try:
+            return [future.result() for future in futures] # Propagate transfer errors
+        finally: # Calls in flight may still use the files of the caller
+            for future in futures:
+                future.cancel()
+
+            wait(futures)
+
     def get_model_version(self, model_name: str, model_version: str) -> any:
-        model_version_local_dpath = os.mkdir(os.path.join(os.getcwd(), "temp_model_version"))
+        if self.model_cache is not None:
+            pickable_model = self.model_cache.get(model_name, model_version)
+
+            if pickable_model is not None:
+                return pickable_model
+
+        with self.prefetch_lock:
+            prefetch_future = self.prefetch_futures.get((model_name, model_version))
+
+        if prefetch_future is not None: # Wait for the prefetch rather than pull twice
+            try:
+                return prefetch_future.result()
+            except Exception:
+                pass # Pulled again below to raise in the caller
+
+        return self.load_model_version(model_name, model_version)
+
+    def load_model_version(self, model_name: str, model_version: str) -> any:
+        if self.mmap_cache is None:
+            pickable_model, nbytes = self.restore_model_version(model_name, model_version)
+        else:
+            pickable_model, nbytes = self.load_mapped_model_version(model_name, model_version)
+
+        if self.model_cache is not None:
+            self.model_cache.put(model_name, model_version, pickable_model, nbytes)
+
+        return pickable_model
+
+    def prefetch(self, model_name: str, versions: list = None) -> list:
+        """
+        Pulls and restores versions of model_name (default: the latest version)
+        into the model cache and the memory-mapped cache on background threads.
+        Returns a Future of each model.
+        """
+        if self.model_cache is None and self.mmap_cache is None:
+            raise ValueError("prefetch requires model_cache_entries, model_cache_bytes "
+                    "or mmap_cache_dpath")
+
+        if versions is None:
+            latest_version = self.get_latest_version(model_name)
+            versions = [] if latest_version is None else [latest_version]
+
+        prefetch_futures = []
+        submitted_futures = {}
+
+        with self.prefetch_lock:
+            if self.prefetch_executor is None:
+                self.prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS,
+                        thread_name_prefix="mlgit_prefetch")
+
+            for model_version in versions:
+                prefetch_key = (model_name, model_version)
+                prefetch_future = self.prefetch_futures.get(prefetch_key)
+
+                if prefetch_future is None:
+                    prefetch_future = self.prefetch_executor.submit(self.prefetch_model_version,
+                            model_name, model_version)
+                    self.prefetch_futures[prefetch_key] = prefetch_future
+                    submitted_futures[prefetch_key] = prefetch_future
+
+                prefetch_futures.append(prefetch_future)
+
+        # Once done the caches serve the model, and the futures must not pin it
+        for prefetch_key, prefetch_future in submitted_futures.items():
+            prefetch_future.add_done_callback(
+                lambda _, prefetch_key=prefetch_key: self.discard_prefetch(prefetch_key)
+            )
+
+        return prefetch_futures
 
-        pull_directory(
-            self.user_name, self.repo_name,
-            self.model_remote_path(model_name, model_version),
-            model_version_local_dpath
+    def prefetch_model_version(self, model_name: str, model_version: str) -> any:
+        pickable_model = None if self.model_cache is None else \
+                self.model_cache.get(model_name, model_version)
+
+        return self.load_model_version(model_name, model_version) \
+                if pickable_model is None else pickable_model
+
+    def discard_prefetch(self, prefetch_key: tuple) -> None:
+        with self.prefetch_lock:
+            self.prefetch_futures.pop(prefetch_key, None)
+
+    def track_latest(self, model_name: str, poll_interval: float = 60) -> None:
+        """
+        Polls the version list of model_name every poll_interval seconds on a
+        background thread and prefetches each new latest version, until
+        stop_tracking. Polls go through the artifact cache when enabled. Failed
+        polls and prefetches are logged on the "mlgit" logger and retried at the
+        next poll; each poll emits a "track_latest" record to metrics_sink.
+        """
+        with self.prefetch_lock:
+            if model_name in self.trackers:
+                return
+
+            stop_event = self.trackers[model_name] = threading.Event()
+
+        def track_latest_version() -> None:
+            latest_version = None
+
+            def on_prefetched(model_version: str, prefetch_future: any) -> None:
+                nonlocal latest_version
+
+                if not prefetch_future.cancelled() and prefetch_future.exception() is not None:
+                    logger.warning("Prefetching version %s of %s failed, retrying at the "
+                            "next poll", model_version, model_name,
+                            exc_info=prefetch_future.exception())
+
+                    if latest_version == model_version:
+                        latest_version = None
+
+            while not stop_event.is_set():
+                try:
+                    with self.instrument("track_latest", model_name):
+                        model_version = self.get_latest_version(model_name)
+
+                        if model_version is not None and model_version != latest_version:
+                            latest_version = model_version
+
+                            for prefetch_future in self.prefetch(model_name, [model_version]):
+                                prefetch_future.add_done_callback(
+                                        functools.partial(on_prefetched, model_version))
+                except Exception:
+                    logger.warning("Polling the latest version of %s failed, retrying in "
+                            "%s seconds", model_name, poll_interval, exc_info=True)
+
+                stop_event.wait(poll_interval)
+
+        threading.Thread(target=track_latest_version, name=f"mlgit_track_{model_name}",
+                daemon=True).start()
+
+    def stop_tracking(self, model_name: str = None) -> None:
+        with self.prefetch_lock:
+            for tracked_model_name in list(self.trackers):
+                if model_name is None or tracked_model_name == model_name:
+                    self.trackers.pop(tracked_model_name).set()
+
+    def close(self) -> None:
+        """
+        Stops every tracker and pending prefetch, and shuts down the thread pools.
+        """
+        self.stop_tracking()
+
+        with self.prefetch_lock:
+            if self.prefetch_executor is not None:
+                self.prefetch_executor.shutdown(wait=False, cancel_futures=True)
+                self.prefetch_executor = None
+
+        with self.executors_lock:
+            for executor in self.executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            self.executors = {}
+
+    def restore_model_version(self, model_name: str, model_version: str) -> tuple:
+        """
+        Pulls and restores a model version, returning (model, serialized size).
+        """
+        model_version_local_dpath = tempfile.mkdtemp(prefix="mlgit_model_version_")
+
+        try:
+            self.pull_remote_directory(self.model_remote_path(model_name, model_version),
+                    model_version_local_dpath)
+
+            self.pull_version_objects(model_version_local_dpath,
+                    self.model_remote_path(model_name, model_version))
+
+            with self.instrument("restore_model",
+                    self.model_remote_path(model_name, model_version, "model")):
+                pickable_model = restore_model(model_version_local_dpath)
+
+            return pickable_model, directory_size(model_version_local_dpath)
+        finally:
+            shutil.rmtree(model_version_local_dpath)
+
+    def mmap_cache_key(self, model_name: str = None, model_version: str = None) -> str:
+        # Keys end with a separator so that they prefix exactly their own entries
+        return ''.join(
+            f"{key_component}/" for key_component in
+            [self.storage.name, self.registry_dpath or "", model_name, model_version]
+            if key_component is not None
         )
 
-        pickable_model = PickableObject.restore(os.path.join(model_version_local_dpath, "model"))
-        shutil.rmtree(model_version_local_dpath)
+    def load_mapped_model_version(self, model_name: str, model_version: str) -> tuple:
+        cache_key = self.mmap_cache_key(model_name, model_version)
+        pickable_model = self.map_model_version(cache_key)
+
+        if pickable_model is None:
+            with self.mmap_cache.filling(cache_key):
+                pickable_model = self.map_model_version(cache_key) # Filled while waiting
+
+                if pickable_model is None:
+                    pickable_model, nbytes = self.restore_model_version(model_name,
+                            model_version)
+
+                    try:
+                        with self.instrument("serialize_model", cache_key):
+                            self.mmap_cache.put(cache_key, pickable_model)
+                    except Exception: # Served without the mmap cache rather than failing
+                        logger.warning("Keeping %s in the mmap cache failed", cache_key,
+                                exc_info=True)
+                        return pickable_model, nbytes
+
+                    # Reloaded so that this process maps the weights as well
+                    pickable_model = self.map_model_version(cache_key)
+
+        return pickable_model, self.mmap_cache.entry_size(cache_key)
+
+    def map_model_version(self, cache_key: str) -> any:
+        with self.instrument("map_model", cache_key) as operation_record:
+            pickable_model = self.mmap_cache.get(cache_key)
+            operation_record["cache_hits" if pickable_model is not None else "cache_misses"] += 1
+
         return pickable_model
 
+    def invalidate_model_cache(self, model_name: str = None, model_version: str = None) -> None:
+        if self.model_cache is not None:
+            self.model_cache.invalidate(model_name, model_version)
+
+        if self.mmap_cache is not None:
+            self.mmap_cache.invalidate(self.mmap_cache_key(
+                model_name, model_version if model_name is not None else None
+            ))
+
+    def pull_remote_directory(self, remote_dpath: str, local_dpath: str) -> None:
+        """
+        Downloads every file under remote_dpath into local_dpath, fetching up to
+        download_concurrency files at a time and retrying each file independently.
+        """
+        with self.instrument("pull_directory", remote_dpath) as operation_record:
+            # Files are pulled concurrently, each counting into a record of its own
+            def pull_remote_file(remote_fpath: str) -> dict:
+                file_record = task_record()
+                local_fpath = os.path.join(local_dpath,
+                        *os.path.relpath(remote_fpath, remote_dpath).split('/'))
+
+                content, _ = call_with_retries(lambda: self.storage.read_file(remote_fpath),
+                        self.download_retries, on_retry=retry_counter(file_record))
+
+                os.makedirs(os.path.dirname(local_fpath), exist_ok=True)
+
+                with open(local_fpath, 'wb') as local_file:
+                    local_file.write(content)
+
+                file_record["bytes"] += len(content)
+                return file_record
+
+            remote_fpaths = call_with_retries(lambda: self.storage.list_directory(remote_dpath),
+                    self.download_retries, on_retry=retry_counter(operation_record))
+            operation_record["files"] = len(remote_fpaths)
+
+            merge_task_records(operation_record, self.map_transfers(pull_remote_file,
+                    remote_fpaths))
+
+    def object_remote_path(self, object_hash: str) -> str:
+        return self.registry_remote_path(f"{OBJECTS_DNAME}/{object_hash}")
+
+    def read_object(self, object_hash: str, operation_record: dict) -> bytes:
+        """
+        Returns the verified content of an object, counting cache hits, misses and
+        bytes read into operation_record. Objects are immutable, so a cached copy
+        is used as is.
+        """
+        remote_fpath = self.object_remote_path(object_hash)
+        cache_key = self.artifact_cache_key(remote_fpath)
+
+        if self.artifact_cache is not None:
+            content = self.artifact_cache.read_content(cache_key)
+
+            if content is not None and content_hash(content) == object_hash:
+                operation_record["cache_hits"] += 1
+                return content
+
+        content, _ = self.storage.read_file(remote_fpath)
+
+        if content_hash(content) != object_hash:
+            raise ChecksumError(remote_fpath)
+
+        if self.artifact_cache is not None:
+            operation_record["cache_misses"] += 1
+            self.artifact_cache.put(cache_key, content, object_hash)
+
+        operation_record["bytes"] += len(content)
+        return content
+
+    def read_objects(self, chunks_manifest: dict) -> bytes:
+        with self.instrument("read_objects") as operation_record:
+            contents = {} # Repeated chunks are fetched once
+
+            for chunk_hash, _ in chunks_manifest["chunks"]:
+                if chunk_hash not in contents:
+                    contents[chunk_hash] = call_with_retries(
+                        lambda: self.read_object(chunk_hash, operation_record),
+                        self.download_retries, on_retry=retry_counter(operation_record)
+                    )
+
+            operation_record["files"] = len(contents)
+
+            return b''.join(contents[chunk_hash] for chunk_hash, _ in chunks_manifest["chunks"])
+
+    def pull_version_objects(self, model_version_local_dpath: str,
+        remote_model_version_dpath: str = None) -> None:
+        """
+        Reassembles the files of a pulled version directory that are kept in objects.
+        """
+        version_objects_fpath = os.path.join(model_version_local_dpath, VERSION_OBJECTS_FNAME)
+
+        if not os.path.exists(version_objects_fpath):
+            return
+
+        for artifact_path, chunks_manifest in json.loads(
+                read_local_file(version_objects_fpath)).items():
+            local_fpath = os.path.join(model_version_local_dpath, *artifact_path.split('/'))
+            os.makedirs(os.path.dirname(local_fpath), exist_ok=True)
+            self.pull_file_chunks(chunks_manifest, local_fpath,
+                    f"{remote_model_version_dpath}/{artifact_path}")
+
+        os.remove(version_objects_fpath)
+
+    def pull_file_chunks(self, chunks_manifest: dict, local_fpath: str,
+        remote_fpath: str = None) -> None:
+        """
+        Reassembles local_fpath from the chunks in chunks_manifest, fetching up to
+        download_concurrency distinct chunks at a time and writing each at every
+        offset it occurs at. Chunks failing verification are fetched again like any
+        transient error.
+        """
+        # Repeated chunks (e.g. runs of zeros) are fetched once
+        chunk_hash_offsets = {}
+
+        for (chunk_hash, _), offset in zip(chunks_manifest["chunks"],
+                chunk_offsets(chunks_manifest)):
+            chunk_hash_offsets.setdefault(chunk_hash, []).append(offset)
+
+        with self.instrument("pull_objects", remote_fpath) as operation_record, \
+                open(local_fpath, 'wb') as local_file:
+            local_file.truncate(chunks_manifest["size"])
+            operation_record["files"] = len(chunk_hash_offsets)
+
+            # Chunks are pulled concurrently, each counting into a record of its own
+            def pull_chunk(chunk_hash: str, offsets: list) -> dict:
+                chunk_record = task_record()
+                content = call_with_retries(
+                    lambda: self.read_object(chunk_hash, chunk_record),
+                    self.download_retries, on_retry=retry_counter(chunk_record)
+                )
+
+                for offset in offsets:
+                    os.pwrite(local_file.fileno(), content, offset)
+
+                return chunk_record
+
+            merge_task_records(operation_record, self.map_transfers(pull_chunk,
+                    chunk_hash_offsets.keys(), chunk_hash_offsets.values()))
+
     # Artifact Logging operations
     def register_model(self, access_token: str, model_name: str) -> None:
-        self.log_json_artifact(
-            access_token=access_token,
-            json_artifact=[],
-            artifact_name="versions",
-            model_name=model_name
-        )
+        version_list_update, written_artifacts, version_summary = \
+                self.version_list_update(model_name, [], reset=True)
+
+        self.update_json_artifacts(access_token, version_list_update, written_artifacts)
+        self.update_manifest_entry(access_token, model_name, version_summary, None, True)
+
+    def update_manifest_entry(self, access_token: str, model_name: str,
+        version_summary: dict, timestamp: str, reset: bool = False) -> None:
+        """
+        Records version_summary {"latest", "count"} of model_name in the registry
+        manifest, unless the manifest already lists more versions of it (written
+        by a concurrent writer that committed its version list later).
+        """
+        def update_model_entry(registry_manifest: dict) -> None:
+            model_entry = registry_manifest["models"].get(model_name) or {}
+
+            if reset or model_entry.get("count", -1) <= version_summary["count"]:
+                registry_manifest["models"][model_name] = {
+                    "latest": version_summary["latest"], "count": version_summary["count"],
+                    "timestamp": timestamp
+                }
+
+        self.update_registry_manifest(access_token, update_model_entry)
+
+    def update_registry_manifest(self, access_token: str, update: callable) -> None:
+        """
+        Applies update, which modifies the registry manifest in place, as a
+        compare-and-swap write retried until it succeeds. The manifest is shared by
+        every model, so it is written apart from the version lists: writers of
+        unrelated models only ever contend on it, and do so without failing.
+        Within batch_logging, update is applied in this way once the batch is
+        published rather than staged with it.
+        """
+        if self.batch_uploads is not None:
+            self.batch_state.manifest_updates.append(update)
+            return
+
+        self.update_json_artifacts(access_token, self.registry_manifest_update(update),
+                max_attempts=None)
+
+    def registry_manifest_update(self, update: callable) -> dict:
+        def update_registry_manifest(registry_manifest: dict) -> dict:
+            registry_manifest = registry_manifest or {"models": {}}
+            update(registry_manifest)
+
+            return registry_manifest
+
+        return {self.registry_remote_path(REGISTRY_MANIFEST_FNAME): update_registry_manifest}
+
+    def update_json_artifacts(self, access_token: str, updates: dict,
+        extra_artifacts: dict = None, max_attempts: int = UPDATE_ATTEMPTS) -> None:
+        """
+        Publishes updates, a mapping of remote JSON file paths to functions from the
+        current value (None when missing) to the new value, together with
+        extra_artifacts (or the artifacts it returns once the updates are applied,
+        when callable) in a single write that only succeeds if none of the files
+        changed since they were read. On a conflict the files are re-read and the
+        updates re-applied, up to max_attempts times (None: until the write
+        succeeds) with jittered backoff.
+
+        An update returning UNCHANGED leaves its file as is, though the write still
+        requires it to be unchanged.
+
+        Within batch_logging the updates are staged with the versions they were
+        read at instead, and the batch raises ConflictError when published.
+        """
+        with self.instrument("update_json", common_remote_path(list(updates))) \
+                as operation_record:
+            for attempt in itertools.count():
+                artifacts = {}
+                expected_versions = {}
+
+                for remote_fpath, update in updates.items():
+                    if self.batch_uploads is not None and remote_fpath in self.batch_uploads:
+                        artifact = bytes(self.batch_uploads[remote_fpath])
+                    else:
+                        artifact, expected_versions[remote_fpath] = \
+                                self.read_remote_artifact_version(remote_fpath)
+
+                    updated_artifact = update(None if artifact is None else
+                            parse_json_artifact(artifact))
+
+                    if updated_artifact is not UNCHANGED:
+                        artifacts[remote_fpath] = json.dumps(updated_artifact).encode()
+
+                artifacts.update((extra_artifacts() if callable(extra_artifacts) else
+                        extra_artifacts) or {})
+
+                try:
+                    return self.upload_artifacts(access_token, artifacts, expected_versions)
+                except ConflictError:
+                    if max_attempts is not None and attempt == max_attempts - 1:
+                        raise
+
+                operation_record["retries"] += 1 # Conflicting concurrent update
+                time.sleep(random.uniform(0,
+                        UPDATE_BACKOFF * 2 ** min(attempt, UPDATE_ATTEMPTS - 1)))
+
+    def read_remote_artifact_version(self, remote_fpath: str) -> tuple:
+        """
+        Returns (artifact, version) for remote_fpath straight from storage, or
+        (None, None) when it does not exist.
+        """
+        try:
+            return call_with_retries(lambda: self.storage.read_file_version(remote_fpath),
+                    self.download_retries)
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
+            return None, None
+
+    def rebuild_registry_manifest(self, access_token: str, model_names: list) -> None:
+        """
+        Backfills the registry manifest of models logged before it existed from their
+        version lists. Timestamps of backfilled versions are unknown.
+        """
+        model_versions = self.get_many_version_lists(model_names)
+
+        self.update_registry_manifest(access_token, lambda manifest: manifest["models"].update({
+            model_name: {
+                "latest": model_versions[model_name][-1] if model_versions[model_name] else None,
+                "count": len(model_versions[model_name]), "timestamp": None
+            } for model_name in model_versions
+        }))
 
     def log_artifact(self, access_token: str, artifact_fpath: str,
         model_name: str, model_version: str = None) -> None:
-        push_files(
-            access_token=access_token,
-            repo_name=self.repo_name,
-            from_local_fpaths=[artifact_fpath],
-            to_remote_dpaths=self.model_remote_path(model_name, model_version)
-        )
+        with open(artifact_fpath, 'rb') as artifact_file:
+            artifact = artifact_file.read()
+
+        self.upload_artifacts(access_token, {
+            self.model_remote_path(model_name, model_version,
+                    os.path.basename(artifact_fpath)): artifact
+        })
+
+    def upload_artifacts(self, access_token: str, artifacts: dict,
+        expected_versions: dict = None) -> None:
+        """
+        Publishes artifacts, a mapping of remote file paths to serialized bytes, as a
+        single storage write straight from memory, or stages them within batch_logging.
+        The write is a compare-and-swap against expected_versions when given.
+        """
+        if self.batch_uploads is not None:
+            for remote_fpath, expected_version in (expected_versions or {}).items():
+                if remote_fpath not in self.batch_uploads: # Expect the version first read
+                    self.batch_state.expected_versions.setdefault(remote_fpath,
+                            expected_version)
+
+            self.batch_uploads.update(artifacts)
+            return
+
+        with self.instrument("write_files", common_remote_path(list(artifacts))) \
+                as operation_record:
+            operation_record["files"] = len(artifacts)
+            operation_record["bytes"] = sum(len(artifact) for artifact in artifacts.values())
+            self.storage.write_files(access_token, artifacts, expected_versions)
+
+        for remote_fpath in artifacts:
+            self.invalidate_artifact_cache(remote_fpath)
+
+    def delete_artifacts(self, access_token: str, remote_fpaths: list) -> None:
+        """
+        Removes remote_fpaths from the remote in a single storage update, or once
+        the batch is published within batch_logging.
+        """
+        if self.batch_uploads is not None:
+            self.batch_state.deletions.extend(remote_fpaths)
+            return
+
+        with self.instrument("delete_files", common_remote_path(remote_fpaths)) \
+                as operation_record:
+            operation_record["files"] = len(remote_fpaths)
+            self.storage.delete_files(access_token, remote_fpaths)
+
+        for remote_fpath in remote_fpaths:
+            self.invalidate_artifact_cache(remote_fpath)
+
+    def invalidate_artifact_cache(self, remote_fpath: str) -> None:
+        if self.artifact_cache is not None:
+            self.artifact_cache.invalidate(self.artifact_cache_key(remote_fpath))
+
+    @contextlib.contextmanager
+    def batch_logging(self, access_token: str) -> None:
+        """
+        Collects every artifact and model version logged within the context, across
+        models and versions, and publishes them in a single storage write when
+        the context exits. Nothing is published if the context raises.
+
+        Reads of artifacts staged within the context return the staged contents.
+        Nested batch_logging contexts join the outermost batch. Registry manifest
+        updates and deletions are not staged: they are applied once the batch is
+        published.
+        """
+        if self.batch_uploads is not None:
+            yield
+            return
+
+        self.batch_uploads = {} # remote_fpath -> staged bytes
+        self.batch_state.expected_versions = {} # remote_fpath -> version read
+        self.batch_state.manifest_updates = [] # Applied once the batch is published
+        self.batch_state.deletions = [] # Idem
+
+        try:
+            yield
+            batch_uploads = self.batch_uploads
+            expected_versions = self.batch_state.expected_versions
+            manifest_updates = self.batch_state.manifest_updates
+            deletions = self.batch_state.deletions
+        finally:
+            # Only this thread's batch ends; the batches of other threads carry on
+            self.batch_uploads = None
+            del self.batch_state.expected_versions
+            del self.batch_state.manifest_updates
+            del self.batch_state.deletions
+
+        if len(batch_uploads) > 0:
+            self.upload_artifacts(access_token, batch_uploads, expected_versions)
+
+        if len(deletions) > 0:
+            self.delete_artifacts(access_token, deletions)
+
+        if len(manifest_updates) > 0:
+            self.update_registry_manifest(access_token, lambda registry_manifest: [
+                update(registry_manifest) for update in manifest_updates
+            ])
 
     def log_json_artifact(self, access_token: str, json_artifact: any,
         artifact_name: str, model_name: str, model_version: str = None) -> None:
-        
-        artifact_temp_fpath = os.path.join(os.getcwd(), f"{artifact_name}.json")
-
-        with open(artifact_temp_fpath, 'w') as artifact_file:
-            json.dump(json_artifact, artifact_file)
+        self.upload_artifacts(access_token, {
+            self.model_remote_path(model_name, model_version, f"{artifact_name}.json"):
+                    self.compress_artifact(json.dumps(json_artifact).encode())
+        })
 
-        self.log_artifact(access_token, artifact_temp_fpath, model_name, model_version)
-        os.remove(artifact_temp_fpath)
+    def compress_artifact(self, artifact: bytes) -> bytes:
+        return artifact if self.codec is None else \
+                self.codec.compress(artifact, self.compression_level)
 
     def log_pandas_artifact(self, access_token: str, pandas_artifact: pd.DataFrame,
         artifact_name: str, model_name: str, model_version: str = None,
-        **to_csv_kwargs) -> any:
-        
-        artifact_temp_fpath = os.path.join(os.getcwd(), f"{artifact_name}.csv")
-        pandas_artifact.to_csv(artifact_temp_fpath, **to_csv_kwargs)
+        **write_kwargs) -> any:
+        remote_artifact_fpath, pandas_format = self.pandas_artifact_remote_path(
+                artifact_name, model_name, model_version)
 
-        self.log_artifact(access_token, artifact_temp_fpath, model_name, model_version)
-        os.remove(artifact_temp_fpath)
+        with self.instrument("serialize_artifact", remote_artifact_fpath):
+            pandas_artifact = self.compress_artifact(
+                pandas_format.serialize(pandas_artifact, **write_kwargs)
+            )
+
+        self.upload_artifacts(access_token, {remote_artifact_fpath: pandas_artifact})
 
     def log_model_backtest(self, access_token: str, model_backtest: pd.DataFrame,
         model_name: str, version_timestamp: datetime.datetime = None) -> None:
         """ 
         """
+        model_backtest = model_backtest.copy(deep=False)
+
         if version_timestamp is None: # Set to most recent prediction
             version_timestamp = model_backtest.index.max()
 
@@ -128,61 +1437,157 @@ class MLGitClient:
         if isinstance(version_timestamp, pd.Period):
             version_timestamp = version_timestamp.to_timestamp()
 
+        # Stored as a timestamp whatever was given, so that every format filters on it
+        version_timestamp = pd.Timestamp(version_timestamp)
+
         if model_backtest.index.name is None:
             model_backtest.index.name = "date"
 
         model_backtest.columns = model_backtest.columns.astype(str)
         model_backtest["version_timestamp"] = version_timestamp
-        
+
+        if self.segment_backtests:
+            return self.log_backtest_segment(access_token, model_backtest, model_name,
+                    version_timestamp)
+
         try:
             prior_model_backtest = self.get_model_backtest(model_name)
-        except:
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
             return self.log_pandas_artifact(access_token, model_backtest,
                     "backtest", model_name)
 
-        # Override values
-        overlapping_backtest = prior_model_backtest[
-            prior_model_backtest.index.isin(model_backtest.index)
-        ]
+        # Written back in the format the prior backtest was found in
+
+        with self.instrument("merge_backtest", model_name):
+            new_model_backtest = merge_backtests(prior_model_backtest, model_backtest,
+                    version_timestamp)
 
-        overlapping_backtest[
-            overlapping_backtest["version_timestamp"] == version_timestamp
-        ] = model_backtest
-
-        # Index < version_timestamp: previous versions take precedence
-        overlapping_backtest[
-            (overlapping_backtest.index <= version_timestamp) &
-            (overlapping_backtest["version_timestamp"] > version_timestamp)
-        ] = model_backtest
-
-        # Index > version_timestamp: newer versions take precedence
-        overlapping_backtest[
-            (overlapping_backtest.index > version_timestamp) &
-            (overlapping_backtest["version_timestamp"] < version_timestamp)
-        ] = model_backtest
-
-        print(overlapping_backtest)
-
-        new_model_backtest = pd.concat([
-            prior_model_backtest[~prior_model_backtest.index.isin(model_backtest.index)],
-            overlapping_backtest,
-            model_backtest[~model_backtest.index.isin(prior_model_backtest.index)]
-        ], axis=0).sort_index()
-        
         self.log_pandas_artifact(access_token, new_model_backtest, "backtest", model_name)
 
+    def log_backtest_segment(self, access_token: str, model_backtest: pd.DataFrame,
+        model_name: str, version_timestamp: datetime.datetime) -> None:
+        version_timestamp = pd.Timestamp(version_timestamp)
+        segment_name = f"{version_timestamp.strftime('%Y%m%dT%H%M%S')}_" + \
+                f"{uuid.uuid4().hex[:8]}.{self.pandas_format}"
+        remote_segment_fpath, pandas_format = self.pandas_artifact_remote_path(
+                segment_name, model_name, BACKTEST_SEGMENTS_DNAME)
+
+        backtest_segment = {
+            "name": segment_name,
+            "version_timestamp": version_timestamp.isoformat(),
+            "start": model_backtest.index.min().isoformat(),
+            "end": model_backtest.index.max().isoformat()
+        }
+
+        with self.instrument("serialize_artifact", remote_segment_fpath):
+            segment_artifact = self.compress_artifact(pandas_format.serialize(model_backtest))
+
+        # The segment and the updated segment index land in the same commit
+        self.update_json_artifacts(access_token, {
+            self.model_remote_path(model_name, None, f"{BACKTEST_SEGMENTS_DNAME}.json"):
+                    lambda backtest_segments: (backtest_segments or []) + [backtest_segment]
+        }, {remote_segment_fpath: segment_artifact})
+
+    def compact_backtest(self, access_token: str, model_name: str) -> None:
+        """
+        Rewrites the compacted backtest and every logged segment into a single
+        backtest artifact and empties the segment index. Both are written by
+        compare-and-swap against the versions that were read, so a segment logged
+        during compaction fails the write, which is retried up to UPDATE_ATTEMPTS
+        times. The compacted segment files are then deleted. Requires
+        segment_backtests.
+        """
+        if not self.segment_backtests:
+            raise ValueError("compact_backtest requires segment_backtests")
+
+        remote_segments_fpath = self.model_remote_path(model_name, None,
+                f"{BACKTEST_SEGMENTS_DNAME}.json")
+
+        with self.instrument("compact_backtest", model_name) as operation_record:
+            for attempt in range(UPDATE_ATTEMPTS):
+                backtest_segments, segments_version = \
+                        self.read_remote_artifact_version(remote_segments_fpath)
+                backtest_segments = [] if backtest_segments is None else \
+                        parse_json_artifact(backtest_segments)
+
+                if len(backtest_segments) == 0:
+                    return
+
+                # Rewritten in the format the compacted backtest is found in, if any
+                for remote_backtest_fpath, pandas_format in \
+                        self.pandas_artifact_remote_paths("backtest", model_name):
+                    model_backtest, backtest_version = \
+                            self.read_remote_artifact_version(remote_backtest_fpath)
+
+                    if model_backtest is not None:
+                        break
+                else:
+                    remote_backtest_fpath, pandas_format = \
+                            self.pandas_artifact_remote_path("backtest", model_name)
+
+                model_backtest = self.merge_backtest_segments(model_name,
+                        None if model_backtest is None else
+                                pandas_format.read_backtest(model_backtest),
+                        backtest_segments)
+
+                with self.instrument("serialize_artifact", remote_backtest_fpath):
+                    model_backtest = self.compress_artifact(pandas_format.serialize(model_backtest))
+
+                try:
+                    self.upload_artifacts(access_token, {
+                        remote_backtest_fpath: model_backtest,
+                        remote_segments_fpath: self.compress_artifact(json.dumps([]).encode())
+                    }, {
+                        remote_backtest_fpath: backtest_version,
+                        remote_segments_fpath: segments_version
+                    })
+                except ConflictError:
+                    if attempt == UPDATE_ATTEMPTS - 1:
+                        raise
+                else:
+                    return self.delete_artifacts(access_token, [
+                        self.pandas_artifact_remote_path(backtest_segment["name"],
+                                model_name, BACKTEST_SEGMENTS_DNAME)[0]
+                        for backtest_segment in backtest_segments
+                    ])
+
+                operation_record["retries"] += 1 # Segment logged during compaction
+                time.sleep(random.uniform(0, UPDATE_BACKOFF * 2 ** attempt))
+
     # Version Logging operations
-    def log_model_version(self, access_token: str, pickable_model: PickableObject,
-        model_name: str, model_version: str) -> None:
+    def log_model_version(self, access_token: str, pickable_model: any,
+        model_name: str, model_version: str, model_serializer: any = None) -> None:
+        """
+        Logs pickable_model with model_serializer (default: the serializer of the
+        client), a ModelSerializer or the name of one.
+        """
+        model_serializer = self.model_serializer if model_serializer is None else \
+                get_model_serializer(model_serializer)
 
-        model_version_local_dpath, model_version_local_fpath = \
-                self.make_model_version_local_paths(model_version)
+        # Serializers write to a path, so the model goes through a private
+        # temporary directory rather than a shared one under the working directory
+        with tempfile.TemporaryDirectory(prefix="mlgit_model_version_") as \
+                model_version_local_dpath:
+            with self.instrument("serialize_model",
+                    self.model_remote_path(model_name, model_version, "model")):
+                save_model(pickable_model, model_version_local_dpath, model_serializer,
+                        self.model_codec(), self.compression_level)
 
-        pickable_model.save(model_version_local_fpath)
-        self.log_model_version_from_local(access_token, model_name, model_version,
-                model_version_local_dpath)
-        
-        shutil.rmtree(model_version_local_dpath)
+            self.log_model_version_from_local(access_token, model_name, model_version,
+                    model_version_local_dpath)
+
+    def model_codec(self) -> Codec:
+        """
+        Returns the codec of logged model files, None when they are kept in objects
+        so that unchanged chunks are shared between versions.
+        """
+        if self.model_chunk_bytes is not None or self.dedup_artifacts:
+            return None
+
+        return self.codec
 
     def make_model_version_local_paths(self, model_version: str) -> tuple:
         model_version_local_dpath = os.path.join(os.getcwd(), model_version)
@@ -193,19 +1598,215 @@ class MLGitClient:
         return model_version_local_dpath, \
                 os.path.join(model_version_local_dpath, "model")
 
+    def log_objects(self, access_token: str, chunks_manifests: dict) -> None:
+        """
+        Uploads the chunks of chunks_manifests, a mapping of local file paths to
+        their chunks manifest, to the objects directory. Chunks are read and
+        published download_concurrency at a time, skipping those already present.
+        """
+        published_fpaths = self.storage.existing_files([
+            self.object_remote_path(chunk_hash)
+            for chunks_manifest in chunks_manifests.values()
+            for chunk_hash, _ in chunks_manifest["chunks"]
+        ])
+        pending_objects = {}
+
+        for local_fpath, chunks_manifest in chunks_manifests.items():
+            with open(local_fpath, 'rb') as local_file:
+                for (chunk_hash, chunk_size), offset in zip(chunks_manifest["chunks"],
+                        chunk_offsets(chunks_manifest)):
+                    remote_fpath = self.object_remote_path(chunk_hash)
+
+                    if remote_fpath in published_fpaths or remote_fpath in pending_objects:
+                        continue
+
+                    local_file.seek(offset)
+                    pending_objects[remote_fpath] = local_file.read(chunk_size)
+
+                    if len(pending_objects) == self.download_concurrency:
+                        self.upload_objects(access_token, pending_objects)
+                        published_fpaths.update(pending_objects)
+                        pending_objects = {}
+
+        self.upload_objects(access_token, pending_objects)
+
+    def object_chunk_bytes(self, local_fpaths: dict, model_version_local_dpath: str) -> dict:
+        """
+        Selects the files of a version directory kept in objects, mapped to their
+        chunk size (None: stored whole).
+        """
+        local_model_fpath = os.path.join(model_version_local_dpath, "model")
+
+        return {
+            local_fpath: self.model_chunk_bytes if local_fpath == local_model_fpath else None
+            for local_fpath in local_fpaths
+            if self.dedup_artifacts or
+                    (self.model_chunk_bytes is not None and local_fpath == local_model_fpath)
+        }
+
+    def upload_objects(self, access_token: str, objects: dict) -> None:
+        if len(objects) == 0:
+            return
+
+        # Content-addressed, so never staged or cached
+        with self.instrument("write_objects", common_remote_path(list(objects))) \
+                as operation_record:
+            operation_record["files"] = len(objects)
+            operation_record["bytes"] = sum(len(content) for content in objects.values())
+
+            call_with_retries(lambda: self.storage.write_files(access_token, objects),
+                    self.download_retries, on_retry=retry_counter(operation_record))
+
     def log_model_version_from_local(self, access_token: str, model_name: str,
         model_version: str, model_version_local_dpath: str) -> None:
-        push_directory(
-            access_token=access_token,
-            repo_name=self.repo_name,
-            from_local_dpath=model_version_local_dpath,
-            to_remote_dpath=self.model_remote_path(model_name, model_version),
-            timeout=120
-        )
+        remote_model_version_dpath = self.model_remote_path(model_name, model_version)
+        local_fpaths = walk_local_directory(model_version_local_dpath,
+                remote_model_version_dpath)
+        object_chunk_bytes = self.object_chunk_bytes(local_fpaths, model_version_local_dpath)
+
+        if len(object_chunk_bytes) > 0:
+            chunks_manifests = {
+                local_fpath: make_chunks_manifest(local_fpath, chunk_bytes,
+                        self.content_defined_chunks)
+                for local_fpath, chunk_bytes in object_chunk_bytes.items()
+            }
+
+            # Objects are published right away, the version only stages their manifest
+            self.log_objects(access_token, chunks_manifests)
+
+            self.upload_artifacts(access_token, {
+                **{remote_fpath: read_local_file(local_fpath)
+                        for local_fpath, remote_fpath in local_fpaths.items()
+                        if local_fpath not in chunks_manifests},
+                f"{remote_model_version_dpath}/{VERSION_OBJECTS_FNAME}": json.dumps({
+                    local_fpaths[local_fpath][len(remote_model_version_dpath) + 1:]:
+                            chunks_manifest
+                    for local_fpath, chunks_manifest in chunks_manifests.items()
+                }).encode()
+            })
+        elif self.batch_uploads is not None:
+            self.upload_artifacts(access_token, {
+                remote_fpath: read_local_file(local_fpath)
+                for local_fpath, remote_fpath in local_fpaths.items()
+            })
+        else:
+            with self.instrument("push_directory", remote_model_version_dpath) \
+                    as operation_record:
+                operation_record["files"] = len(local_fpaths)
+                operation_record["bytes"] = directory_size(model_version_local_dpath)
+
+                self.storage.push_directory(access_token, model_version_local_dpath,
+                        remote_model_version_dpath)
+
+        self.invalidate_model_cache(model_name, model_version)
+
+        model_metadata = read_model_metadata(model_version_local_dpath)
+        model_version_entry = {
+            "version": model_version,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "serializer": model_metadata["serializer"],
+            "codec": model_metadata["codec"],
+            "artifacts": {
+                remote_fpath[len(remote_model_version_dpath) + 1:]: os.path.getsize(local_fpath)
+                for local_fpath, remote_fpath in walk_local_directory(
+                        model_version_local_dpath, remote_model_version_dpath).items()
+            }
+        }
+
+        version_list_update, written_artifacts, version_summary = \
+                self.version_list_update(model_name, [model_version_entry])
+
+        # The version is published by its version list, then listed in the manifest
+        self.update_json_artifacts(access_token, version_list_update, written_artifacts)
+        self.update_manifest_entry(access_token, model_name, version_summary,
+                model_version_entry["timestamp"])
+
+    def version_list_update(self, model_name: str, model_versions: list,
+        reset: bool = False) -> tuple:
+        """
+        Returns (updates, extra_artifacts, version_summary) for update_json_artifacts
+        appending model_versions, version entries or names, to the version list of
+        model_name, or replacing it with them when reset. version_summary holds the
+        "latest" version and version "count" of the written version list once
+        the update is applied.
+
+        Versions go to the tail of the version head of the model whenever it has
+        one, whatever segment_versions, and full segments of the tail are sealed
+        into immutable segment files written alongside it. segment_versions only
+        decides the layout of models without a head: with it, the versions.json
+        of the model is moved into a new head, otherwise the versions are appended
+        to versions.json, which only lists their names, and their entries to
+        version_entries.json. The head is always part of the compare-and-swap, so
+        a head created concurrently fails the write and the update is re-applied
+        to it.
+        """
+        version_head_fpath = self.model_remote_path(model_name, None,
+                f"{VERSION_SEGMENTS_DNAME}.json")
+        version_list_fpath = self.model_remote_path(model_name, None, "versions.json")
+        version_entries_fpath = self.model_remote_path(model_name, None,
+                "version_entries.json")
+        read_version_lists = {} # remote_fpath -> content as read on the current attempt
+        written_artifacts = {} # remote_fpath -> content, refilled on every attempt
+        version_summary = {}
+
+        def read_version_list(remote_fpath: str) -> callable:
+            def read(version_list: list) -> object:
+                read_version_lists[remote_fpath] = version_list or []
+                return UNCHANGED
+
+            return read
+
+        def update_version_head(version_head: dict) -> dict:
+            written_artifacts.clear()
+            version_list = [] if reset else merge_version_entries(
+                    read_version_lists.get(version_list_fpath) or [],
+                    read_version_lists.get(version_entries_fpath) or [])
+
+            if version_head is None and not self.segment_versions:
+                version_list = version_list + [
+                    version_entry(model_version) for model_version in model_versions
+                ]
+                written_artifacts[version_list_fpath] = json.dumps([
+                    version_entry["version"] for version_entry in version_list
+                ]).encode()
+                written_artifacts[version_entries_fpath] = json.dumps(version_list).encode()
+                version_summary.update(count=len(version_list),
+                        latest=version_list[-1]["version"] if len(version_list) > 0 else None)
+
+                return UNCHANGED
+
+            if version_head is None or reset: # Moves the versions.json of the model over
+                new_versions = version_list + model_versions
+                version_head = empty_version_head()
+            else:
+                new_versions = model_versions
+
+            segment_size = version_head["segment_size"]
+            tail = version_head["tail"] + new_versions
+            segment_idx = (version_head["count"] - len(version_head["tail"])) // segment_size
+
+            while len(tail) >= segment_size:
+                written_artifacts[self.model_remote_path(model_name, VERSION_SEGMENTS_DNAME,
+                        f"{segment_idx}.json")] = json.dumps(tail[:segment_size]).encode()
+                tail = tail[segment_size:]
+                segment_idx += 1
+
+            version_summary.update(count=version_head["count"] + len(new_versions),
+                    latest=version_entry(new_versions[-1])["version"]
+                            if len(new_versions) > 0 else version_head["latest"])
+
+            return {**version_summary, "segment_size": segment_size, "tail": tail}
+
+        # A segmented writer only reads versions.json while the model has no head
+        updates = {} if self.segment_versions and \
+                self.read_remote_artifact_version(version_head_fpath)[0] is not None \
+                else {
+                    version_list_fpath: read_version_list(version_list_fpath),
+                    version_entries_fpath: read_version_list(version_entries_fpath)
+                }
+        updates[version_head_fpath] = update_version_head # Applied after versions.json
 
-        model_versions = self.get_version_list(model_name)
-        model_versions.append(model_version)
-        self.log_json_artifact(access_token, model_versions, "versions", model_name)
+        return updates, lambda: dict(written_artifacts), version_summary
 
 if __name__ == "__main__":
     pass
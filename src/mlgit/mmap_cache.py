@@ -0,0 +1,228 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import shutil
+import threading
+import uuid
+
+def map_buffer(buffer_fpath: str) -> any:
+    with open(buffer_fpath, 'rb') as buffer_file:
+        if os.fstat(buffer_file.fileno()).st_size == 0:
+            return b'' # Empty files cannot be mapped
+
+        # The mapping outlives the file object
+        return mmap.mmap(buffer_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+class MmapModelCache:
+    """
+    Persistent on-disk cache of restored models, shared by every process on a host.
+
+    Each entry is a directory under cache_dpath
+        - <key_hash>/model.pkl    pickle protocol 5 stream
+        - <key_hash>/<i>.buf      out-of-band buffers of min_buffer_bytes or more
+        - <key_hash>/entry.json   entry metadata (cache key, buffer count)
+
+    Buffers, such as the data of numpy arrays, are memory-mapped read-only when
+    an entry is loaded, so processes loading the same model share its physical
+    pages and restored arrays are read-only. Entries are never revalidated:
+    model versions are assumed immutable once logged.
+
+    With max_bytes, the least recently loaded entries are evicted once the total
+    size of the entries exceeds max_bytes, skipping those being filled by any
+    thread or process. Processes that mapped an evicted entry keep their
+    mappings, whose pages are freed once they are unmapped.
+    """
+    def __init__(self, cache_dpath: str, min_buffer_bytes: int = 2 ** 16,
+        max_bytes: int = None):
+        self.cache_dpath = cache_dpath
+        self.min_buffer_bytes = min_buffer_bytes
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.key_locks = {} # key_hash -> threading.Lock (POSIX locks only exclude processes)
+
+        os.makedirs(cache_dpath, exist_ok=True)
+
+    def key_hash(self, key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def entry_dpath(self, key: str) -> str:
+        return os.path.join(self.cache_dpath, self.key_hash(key))
+
+    def key_lock(self, key_hash: str) -> threading.Lock:
+        with self.lock:
+            return self.key_locks.setdefault(key_hash, threading.Lock())
+
+    def get_metadata(self, key: str) -> dict:
+        try:
+            with open(os.path.join(self.entry_dpath(key), "entry.json"), 'r') as metadata_file:
+                metadata = json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+        return metadata if metadata.get("key") == key else None
+
+    def get(self, key: str) -> any:
+        metadata = self.get_metadata(key)
+
+        if metadata is None:
+            return None
+
+        entry_dpath = self.entry_dpath(key)
+
+        try:
+            os.utime(os.path.join(entry_dpath, "entry.json")) # Mark as most recently used
+
+            with open(os.path.join(entry_dpath, "model.pkl"), 'rb') as model_file:
+                return pickle.load(model_file, buffers=[
+                    map_buffer(os.path.join(entry_dpath, f"{buffer_idx}.buf"))
+                    for buffer_idx in range(metadata["buffers"])
+                ])
+        except FileNotFoundError: # Evicted while loading
+            return None
+
+    def put(self, key: str, model: any) -> None:
+        buffers = []
+
+        def keep_in_band(buffer: pickle.PickleBuffer) -> bool:
+            if buffer.raw().nbytes < self.min_buffer_bytes:
+                return True
+
+            buffers.append(buffer)
+            return False
+
+        try:
+            model_pickle = pickle.dumps(model, protocol=5, buffer_callback=keep_in_band)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            # Models only cloudpickle serializes, such as those logged with it. The
+            # stream loads with pickle all the same. Requires cloudpickle.
+            import cloudpickle
+
+            buffers.clear()
+            model_pickle = cloudpickle.dumps(model, protocol=5, buffer_callback=keep_in_band)
+
+        # Written aside and renamed into place so that readers never see partial entries
+        temp_dpath = os.path.join(self.cache_dpath, f"{uuid.uuid4().hex}.tmp")
+        os.makedirs(temp_dpath)
+
+        try:
+            with open(os.path.join(temp_dpath, "model.pkl"), 'wb') as model_file:
+                model_file.write(model_pickle)
+
+            for buffer_idx, buffer in enumerate(buffers):
+                with open(os.path.join(temp_dpath, f"{buffer_idx}.buf"), 'wb') as buffer_file:
+                    buffer_file.write(buffer.raw())
+
+            with open(os.path.join(temp_dpath, "entry.json"), 'w') as metadata_file:
+                json.dump({"key": key, "buffers": len(buffers)}, metadata_file)
+
+            shutil.rmtree(self.entry_dpath(key), ignore_errors=True)
+            os.rename(temp_dpath, self.entry_dpath(key))
+        finally:
+            shutil.rmtree(temp_dpath, ignore_errors=True)
+
+        if self.max_bytes is not None:
+            self.evict(self.key_hash(key))
+
+    def entry_size(self, key: str) -> int:
+        return self.directory_size(self.entry_dpath(key))
+
+    def directory_size(self, entry_dpath: str) -> int:
+        try:
+            return sum(
+                os.path.getsize(os.path.join(entry_dpath, fname))
+                for fname in os.listdir(entry_dpath)
+            )
+        except FileNotFoundError: # Evicted by a concurrent process
+            return 0
+
+    @contextlib.contextmanager
+    def filling(self, key: str) -> None:
+        """
+        Holds the entry of key exclusively, so that a single thread on the host
+        restores a missing model while the others wait for its entry.
+        """
+        with self.key_lock(self.key_hash(key)), \
+                open(f"{self.entry_dpath(key)}.lock", 'a') as lock_file:
+            fcntl.lockf(lock_file, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+    def evict(self, kept_key_hash: str = None) -> None:
+        """
+        Evicts the least recently loaded entries, other than that of kept_key_hash,
+        until the cache holds max_bytes or less.
+        """
+        entries = []
+
+        for dname in os.listdir(self.cache_dpath):
+            entry_dpath = os.path.join(self.cache_dpath, dname)
+
+            if dname.endswith(".tmp") or not os.path.isdir(entry_dpath):
+                continue
+
+            try:
+                stat = os.stat(os.path.join(entry_dpath, "entry.json"))
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, self.directory_size(entry_dpath), dname))
+
+        total_bytes = sum(nbytes for _, nbytes, _ in entries)
+
+        # Least recently used entries first
+        for _, nbytes, key_hash in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+
+            if key_hash != kept_key_hash and self.evict_entry(key_hash):
+                total_bytes -= nbytes
+
+    def evict_entry(self, key_hash: str) -> bool:
+        """
+        Removes the entry of key_hash unless a thread or process is filling it.
+        Returns whether it was removed.
+        """
+        key_lock = self.key_lock(key_hash)
+
+        if not key_lock.acquire(blocking=False):
+            return False
+
+        try:
+            with open(os.path.join(self.cache_dpath, f"{key_hash}.lock"), 'a') as lock_file:
+                try:
+                    fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError: # Filled by another process
+                    return False
+
+                try:
+                    shutil.rmtree(os.path.join(self.cache_dpath, key_hash), ignore_errors=True)
+                finally:
+                    fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+            return True
+        finally:
+            key_lock.release()
+
+    def invalidate(self, key_prefix: str = "") -> None:
+        """
+        Drops every entry whose key starts with key_prefix. Processes that already
+        mapped an entry keep their mappings.
+        """
+        for dname in os.listdir(self.cache_dpath):
+            entry_dpath = os.path.join(self.cache_dpath, dname)
+
+            try:
+                with open(os.path.join(entry_dpath, "entry.json"), 'r') as metadata_file:
+                    key = json.load(metadata_file)["key"]
+            except (OSError, ValueError, KeyError):
+                continue
+
+            if key.startswith(key_prefix):
+                shutil.rmtree(entry_dpath, ignore_errors=True)
@@ -0,0 +1,59 @@
+import threading
+
+from collections import OrderedDict
+
+class ModelCache:
+    """
+    In-memory LRU cache of restored models keyed by (model_name, model_version).
+
+    The cache is bounded by max_entries and by max_bytes, where the size of a
+    model is estimated from the size of its serialized version directory.
+    Cached models are shared between callers and must be treated as read-only.
+    """
+    def __init__(self, max_entries: int = None, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # (model_name, model_version) -> (model, nbytes)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, model_name: str, model_version: str) -> any:
+        with self.lock:
+            entry = self.entries.get((model_name, model_version))
+
+            if entry is None:
+                return None
+
+            self.entries.move_to_end((model_name, model_version))
+            return entry[0]
+
+    def put(self, model_name: str, model_version: str, model: any, nbytes: int) -> None:
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+
+        with self.lock:
+            self.discard((model_name, model_version))
+            self.entries[(model_name, model_version)] = (model, nbytes)
+            self.total_bytes += nbytes
+
+            while (self.max_entries is not None and len(self.entries) > self.max_entries) or \
+                    (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                _, (_, evicted_nbytes) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_nbytes
+
+    def invalidate(self, model_name: str = None, model_version: str = None) -> None:
+        """
+        Drops every cached model matching model_name and model_version, where None
+        matches any value.
+        """
+        with self.lock:
+            for cache_key in list(self.entries):
+                if (model_name is None or cache_key[0] == model_name) and \
+                        (model_version is None or cache_key[1] == model_version):
+                    self.discard(cache_key)
+
+    def discard(self, cache_key: tuple) -> None:
+        entry = self.entries.pop(cache_key, None)
+
+        if entry is not None:
+            self.total_bytes -= entry[1]
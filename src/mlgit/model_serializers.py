@@ -0,0 +1,247 @@
+import json
+import os
+import pickle
+import struct
+
+from pyutils.pickable import PickableObject
+
+from .compression import Codec, compress_file, decompress_file, get_codec
+
+MODEL_METADATA_FNAME = ".model.json"
+BUFFER_ALIGNMENT = 64
+
+def aligned(offset: int) -> int:
+    return -(-offset // BUFFER_ALIGNMENT) * BUFFER_ALIGNMENT
+
+def read_model_file(model_fpath: str) -> memoryview:
+    """
+    Reads model_fpath into a single writable buffer, so that arrays restored from
+    slices of it need no further copies.
+    """
+    content = bytearray(os.path.getsize(model_fpath))
+
+    with open(model_fpath, 'rb') as model_file:
+        model_file.readinto(content)
+
+    return memoryview(content)
+
+class ModelSerializer:
+    """
+    Serialization engine of model versions, recorded by name in the version
+    metadata so that readers restore each version with the engine it was
+    logged with.
+    """
+    name = None
+
+    def save(self, model: any, model_fpath: str) -> None:
+        raise NotImplementedError()
+
+    def restore(self, model_fpath: str) -> any:
+        raise NotImplementedError()
+
+class PickableSerializer(ModelSerializer):
+    """
+    PickableObject.save and restore. Versions logged without metadata use it.
+    """
+    name = "pickable"
+
+    def save(self, model: PickableObject, model_fpath: str) -> None:
+        model.save(model_fpath)
+
+    def restore(self, model_fpath: str) -> any:
+        return PickableObject.restore(model_fpath)
+
+class Pickle5Serializer(ModelSerializer):
+    """
+    Pickle protocol 5 with out-of-band buffers, such as numpy array data, written
+    raw after the pickle stream instead of being copied into it. File layout
+        - header: buffer count and pickle length (uint64 each)
+        - buffer lengths (uint64 each)
+        - pickle stream
+        - buffers, each aligned to BUFFER_ALIGNMENT bytes
+    """
+    name = "pickle5"
+
+    def save(self, model: any, model_fpath: str) -> None:
+        buffers = []
+        model_pickle = pickle.dumps(model, protocol=5, buffer_callback=buffers.append)
+        buffers = [buffer.raw() for buffer in buffers]
+
+        with open(model_fpath, 'wb') as model_file:
+            model_file.write(struct.pack(f"<{2 + len(buffers)}Q", len(buffers),
+                    len(model_pickle), *[buffer.nbytes for buffer in buffers]))
+            model_file.write(model_pickle)
+
+            for buffer in buffers:
+                model_file.seek(aligned(model_file.tell()))
+                model_file.write(buffer)
+
+    def restore(self, model_fpath: str) -> any:
+        content = read_model_file(model_fpath)
+        nbuffers, pickle_bytes = struct.unpack_from("<2Q", content)
+        buffer_sizes = struct.unpack_from(f"<{nbuffers}Q", content, 16)
+        offset = 16 + 8 * nbuffers + pickle_bytes
+        buffers = []
+
+        for buffer_size in buffer_sizes:
+            offset = aligned(offset)
+            buffers.append(content[offset:offset + buffer_size])
+            offset += buffer_size
+
+        return pickle.loads(content[16 + 8 * nbuffers:16 + 8 * nbuffers + pickle_bytes],
+                buffers=buffers)
+
+class JoblibSerializer(ModelSerializer):
+    """
+    joblib.dump with compression level compress (0: uncompressed). Requires joblib.
+    """
+    name = "joblib"
+
+    def __init__(self, compress: int = 3):
+        self.compress = compress
+
+    def save(self, model: any, model_fpath: str) -> None:
+        import joblib
+
+        joblib.dump(model, model_fpath, compress=self.compress)
+
+    def restore(self, model_fpath: str) -> any:
+        import joblib
+
+        return joblib.load(model_fpath)
+
+class CloudpickleSerializer(ModelSerializer):
+    """
+    cloudpickle, which also serializes lambdas, closures and classes defined in
+    __main__. Restoring only needs pickle. Requires cloudpickle.
+    """
+    name = "cloudpickle"
+
+    def save(self, model: any, model_fpath: str) -> None:
+        import cloudpickle
+
+        with open(model_fpath, 'wb') as model_file:
+            cloudpickle.dump(model, model_file, protocol=5)
+
+    def restore(self, model_fpath: str) -> any:
+        with open(model_fpath, 'rb') as model_file:
+            return pickle.load(model_file)
+
+class TensorSerializer(ModelSerializer):
+    """
+    Raw numpy tensors for models given as a dict of names to numpy arrays, in a
+    safetensors-style layout: a JSON header length (uint64), the JSON header
+        {name: {"dtype", "shape", "data_offsets": [start, end]}}
+    and the raw array data, each array aligned to BUFFER_ALIGNMENT bytes. Arrays
+    are restored without parsing or copying, and no code runs on restore.
+    """
+    name = "tensors"
+
+    def save(self, model: dict, model_fpath: str) -> None:
+        import numpy as np
+
+        if not isinstance(model, dict):
+            raise TypeError(f"tensors models must be dicts of numpy arrays, not {type(model)}")
+
+        # np.require rather than np.ascontiguousarray, which turns 0-d arrays into 1-d
+        arrays = {name: np.require(array, requirements="C") for name, array in model.items()}
+        header = {}
+        offset = 0
+
+        for name, array in arrays.items():
+            if array.dtype.hasobject:
+                raise TypeError(f"tensor '{name}' has dtype {array.dtype}")
+
+            offset = aligned(offset)
+            header[name] = {"dtype": array.dtype.str, "shape": list(array.shape),
+                    "data_offsets": [offset, offset + array.nbytes]}
+            offset += array.nbytes
+
+        header_bytes = json.dumps(header).encode()
+        data_offset = aligned(8 + len(header_bytes))
+
+        with open(model_fpath, 'wb') as model_file:
+            model_file.write(struct.pack("<Q", len(header_bytes)))
+            model_file.write(header_bytes)
+
+            for name, array in arrays.items():
+                model_file.seek(data_offset + header[name]["data_offsets"][0])
+                model_file.write(array.data)
+
+            model_file.truncate(data_offset + offset) # Trailing empty arrays
+
+    def restore(self, model_fpath: str) -> dict:
+        import numpy as np
+
+        content = read_model_file(model_fpath)
+        header_bytes, = struct.unpack_from("<Q", content)
+        header = json.loads(bytes(content[8:8 + header_bytes]))
+        data_offset = aligned(8 + header_bytes)
+
+        return {
+            name: np.frombuffer(content[data_offset + start:data_offset + end],
+                    dtype=np.dtype(tensor["dtype"])).reshape(tensor["shape"])
+            for name, tensor in header.items()
+            for start, end in [tensor["data_offsets"]]
+        }
+
+MODEL_SERIALIZERS = {
+    model_serializer.name: model_serializer
+    for model_serializer in [PickableSerializer(), Pickle5Serializer(), JoblibSerializer(),
+            CloudpickleSerializer(), TensorSerializer()]
+}
+
+def get_model_serializer(model_serializer: any) -> ModelSerializer:
+    """
+    Returns the ModelSerializer named model_serializer, or model_serializer itself
+    when it is already one.
+    """
+    if isinstance(model_serializer, ModelSerializer):
+        return model_serializer
+
+    if model_serializer not in MODEL_SERIALIZERS:
+        raise ValueError(f"unsupported model serializer '{model_serializer}'")
+
+    return MODEL_SERIALIZERS[model_serializer]
+
+def save_model(model: any, model_version_local_dpath: str,
+    model_serializer: ModelSerializer, codec: Codec = None,
+    compression_level: int = None) -> None:
+    """
+    Writes model and its metadata to a version directory, compressing the model
+    file with codec when given.
+    """
+    model_fpath = os.path.join(model_version_local_dpath, "model")
+    model_serializer.save(model, model_fpath)
+    model_metadata = {"serializer": model_serializer.name}
+
+    if codec is not None:
+        compress_file(model_fpath, codec, compression_level)
+        model_metadata["codec"] = codec.name
+
+    with open(os.path.join(model_version_local_dpath, MODEL_METADATA_FNAME), 'w') \
+            as metadata_file:
+        json.dump(model_metadata, metadata_file)
+
+def read_model_metadata(model_version_local_dpath: str) -> dict:
+    """
+    Returns the metadata {"serializer", "codec"} of a version directory, that of
+    PickableObject.save for versions logged without metadata.
+    """
+    try:
+        with open(os.path.join(model_version_local_dpath, MODEL_METADATA_FNAME), 'r') \
+                as metadata_file:
+            model_metadata = json.load(metadata_file)
+    except FileNotFoundError:
+        model_metadata = {}
+
+    return {"serializer": PickableSerializer.name, "codec": None, **model_metadata}
+
+def restore_model(model_version_local_dpath: str) -> any:
+    model_metadata = read_model_metadata(model_version_local_dpath)
+    model_fpath = os.path.join(model_version_local_dpath, "model")
+
+    if model_metadata["codec"] is not None:
+        decompress_file(model_fpath, get_codec(model_metadata["codec"]))
+
+    return get_model_serializer(model_metadata["serializer"]).restore(model_fpath)
@@ -0,0 +1,131 @@
+import io
+
+import pandas as pd
+
+from .backtest import filter_backtest
+from .compression import decompress_artifact, open_artifact
+
+class PandasFormat:
+    """
+    Serialization format of pandas artifacts, selected by file extension. Readers
+    accept artifacts compressed by any codec of compression.
+    """
+    extension = None
+
+    def serialize(self, pandas_artifact: pd.DataFrame, **write_kwargs) -> bytes:
+        raise NotImplementedError()
+
+    def read(self, artifact: bytes, columns: list = None, **read_kwargs) -> pd.DataFrame:
+        raise NotImplementedError()
+
+    def read_backtest(self, artifact: bytes, start: any = None, end: any = None,
+        columns: list = None, version_timestamp: any = None) -> pd.DataFrame:
+        """
+        Reads a backtest indexed by date with a parsed version_timestamp column,
+        keeping the rows in [start, end] logged at version_timestamp and the given
+        columns plus version_timestamp.
+        """
+        raise NotImplementedError()
+
+class CsvFormat(PandasFormat):
+    extension = "csv"
+
+    def serialize(self, pandas_artifact: pd.DataFrame, **to_csv_kwargs) -> bytes:
+        return pandas_artifact.to_csv(**to_csv_kwargs).encode()
+
+    def read(self, artifact: bytes, columns: list = None, **read_csv_kwargs) -> pd.DataFrame:
+        if columns is not None:
+            read_csv_kwargs["usecols"] = columns
+
+        # Compressed artifacts are decompressed as the parser consumes them
+        return pd.read_csv(open_artifact(artifact), **read_csv_kwargs)
+
+    def read_backtest(self, artifact: bytes, start: any = None, end: any = None,
+        columns: list = None, version_timestamp: any = None) -> pd.DataFrame:
+        if columns is not None: # The index is stored as the first column
+            index_name = self.read(artifact, nrows=0).columns[0]
+            columns = list(dict.fromkeys([index_name, *columns, "version_timestamp"]))
+
+        model_backtest = self.read(artifact, columns)
+
+        index_name = model_backtest.columns[0]
+        model_backtest[index_name] = pd.to_datetime(model_backtest[index_name])
+        # ISO8601 also parses histories mixing dates and datetimes
+        model_backtest["version_timestamp"] = pd.to_datetime(model_backtest["version_timestamp"],
+                format="ISO8601")
+        model_backtest = model_backtest.set_index(index_name)
+
+        return filter_backtest(model_backtest, start, end, version_timestamp)
+
+class ParquetFormat(PandasFormat):
+    """
+    Columnar format that keeps dtypes and the index, including DatetimeIndex, and
+    only decodes the requested columns. Requires pyarrow.
+    """
+    extension = "parquet"
+
+    def serialize(self, pandas_artifact: pd.DataFrame, **to_parquet_kwargs) -> bytes:
+        return pandas_artifact.to_parquet(**to_parquet_kwargs)
+
+    def read(self, artifact: bytes, columns: list = None, **read_parquet_kwargs) -> pd.DataFrame:
+        return pd.read_parquet(io.BytesIO(decompress_artifact(artifact)), columns=columns,
+                **read_parquet_kwargs)
+
+    def read_backtest(self, artifact: bytes, start: any = None, end: any = None,
+        columns: list = None, version_timestamp: any = None) -> pd.DataFrame:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        artifact = decompress_artifact(artifact) # Parquet needs random access
+
+        # Row filters are checked against row group statistics before decoding
+        parquet_file = pq.ParquetFile(io.BytesIO(artifact))
+        index_name = parquet_file.schema_arrow.pandas_metadata["index_columns"][0]
+        # Backtests logged with string version timestamps are filtered once parsed
+        parsed_version_timestamps = pa.types.is_timestamp(
+                parquet_file.schema_arrow.field("version_timestamp").type)
+        filters = [
+            (column, operator, pd.Timestamp(value)) for column, operator, value in [
+                (index_name, ">=", start), (index_name, "<=", end),
+                ("version_timestamp", "==",
+                        version_timestamp if parsed_version_timestamps else None)
+            ] if value is not None
+        ]
+
+        if columns is not None:
+            columns = list(dict.fromkeys([*columns, "version_timestamp"]))
+
+        model_backtest = pq.read_table(io.BytesIO(artifact), columns=columns,
+                filters=filters or None, use_pandas_metadata=True).to_pandas()
+
+        if parsed_version_timestamps:
+            return model_backtest
+
+        model_backtest["version_timestamp"] = pd.to_datetime(model_backtest["version_timestamp"],
+                format="ISO8601")
+
+        return filter_backtest(model_backtest, version_timestamp=version_timestamp)
+
+PANDAS_FORMATS = {
+    pandas_format.extension: pandas_format
+    for pandas_format in [CsvFormat(), ParquetFormat()]
+}
+
+def has_pandas_format(artifact_name: str) -> bool:
+    stem, _, extension = artifact_name.rpartition('.')
+
+    return bool(stem) and extension in PANDAS_FORMATS
+
+def split_pandas_format(artifact_name: str, default_format: str = "csv") -> tuple:
+    """
+    Returns (artifact_name, PandasFormat), detecting the format from a known file
+    extension on artifact_name and falling back to default_format.
+    """
+    if has_pandas_format(artifact_name):
+        stem, _, extension = artifact_name.rpartition('.')
+        return stem, PANDAS_FORMATS[extension]
+
+    if default_format not in PANDAS_FORMATS:
+        raise ValueError(f"unsupported pandas artifact format '{default_format}'")
+
+    return artifact_name, PANDAS_FORMATS[default_format]
@@ -0,0 +1,422 @@
+import fcntl
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import uuid
+
+from pyutils.git import push_directory, push_files
+
+from .errors import ConflictError
+from .github_api import PUSH_ATTEMPTS, PUSH_BACKOFF, list_remote_directory, \
+        list_remote_file_names, push_contents, read_remote_blob, read_remote_file_conditional
+
+LOCAL_LOCK_FNAME = ".mlgit.lock"
+
+local_write_lock = threading.Lock()
+
+def is_not_found(error: Exception) -> bool:
+    """
+    Tells whether error reports a missing remote file, as raised by any backend.
+    """
+    return isinstance(error, FileNotFoundError) or \
+            (isinstance(error, urllib.error.HTTPError) and error.code == 404)
+
+def walk_local_directory(local_dpath: str, remote_dpath: str) -> dict:
+    """
+    Maps every file under local_dpath to its remote file path under remote_dpath.
+    """
+    return {
+        os.path.join(dpath, fname): '/'.join([remote_dpath,
+                *os.path.relpath(os.path.join(dpath, fname), local_dpath).split(os.sep)])
+        for dpath, _, fnames in os.walk(local_dpath) for fname in fnames
+    }
+
+def stat_etag(stat: os.stat_result) -> str:
+    return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+class Storage:
+    """
+    Remote operations used by MLGitClient. Remote paths are '/'-separated and
+    relative to the root of the registry repository.
+    """
+    name = None
+
+    def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+        """
+        Returns (content, etag) for remote_fpath, where content is None when the
+        file is unchanged from etag.
+        """
+        raise NotImplementedError()
+
+    def list_directory(self, remote_dpath: str) -> list:
+        """
+        Returns the paths of every file under remote_dpath, recursing into subdirectories.
+        """
+        raise NotImplementedError()
+
+    def existing_files(self, remote_fpaths: list) -> set:
+        """
+        Returns the subset of remote_fpaths that exist, listing each of their
+        directories once.
+        """
+        existing_fpaths = set()
+
+        for remote_dpath in {remote_fpath.rpartition('/')[0] for remote_fpath in remote_fpaths}:
+            existing_fpaths.update(self.list_file_names(remote_dpath))
+
+        return existing_fpaths & set(remote_fpaths)
+
+    def list_file_names(self, remote_dpath: str) -> list:
+        """
+        Returns the paths of the files in remote_dpath, or [] when it does not exist.
+        Backends may also include files in subdirectories.
+        """
+        try:
+            return self.list_directory(remote_dpath)
+        except Exception as error:
+            if not is_not_found(error):
+                raise
+
+            return []
+
+    def push_files(self, access_token: str, local_fpaths: list, remote_dpaths: list) -> None:
+        """
+        Publishes each local file into the matching remote directory as a single update.
+        """
+        raise NotImplementedError()
+
+    def read_file_version(self, remote_fpath: str) -> tuple:
+        """
+        Returns (content, version) for remote_fpath, where version is the token that
+        write_files compares against in expected_versions.
+        """
+        return self.read_file(remote_fpath)
+
+    def write_files(self, access_token: str, contents: dict,
+        expected_versions: dict = None) -> None:
+        """
+        Publishes contents, a mapping of remote file paths to bytes-like objects,
+        as a single update without going through local files.
+
+        expected_versions maps remote file paths to the version read_file_version
+        returned for them (None: must not exist). The update is applied only if
+        every such file still has that version, and raises ConflictError otherwise.
+        """
+        raise NotImplementedError()
+
+    def delete_files(self, access_token: str, remote_fpaths: list) -> None:
+        """
+        Removes remote_fpaths as a single update, skipping the ones that do not exist.
+        """
+        raise NotImplementedError()
+
+    def push_directory(self, access_token: str, local_dpath: str, remote_dpath: str) -> None:
+        local_fpaths = walk_local_directory(local_dpath, remote_dpath)
+
+        self.push_files(access_token, list(local_fpaths),
+                [remote_fpath.rsplit('/', 1)[0] for remote_fpath in local_fpaths.values()])
+
+class GitHubStorage(Storage):
+    """
+    GitHub-hosted registry repository. Reads go through the contents API and
+    writes through pyutils.git.
+    """
+    def __init__(self, user_name: str, repo_name: str, read_access_token: str = None):
+        self.user_name = user_name
+        self.repo_name = repo_name
+        self.read_access_token = read_access_token
+        self.name = f"github:{user_name}/{repo_name}"
+
+    def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+        return read_remote_file_conditional(self.user_name, self.repo_name, remote_fpath,
+                etag, self.read_access_token)
+
+    def list_directory(self, remote_dpath: str) -> list:
+        return list_remote_directory(self.user_name, self.repo_name, remote_dpath,
+                self.read_access_token)
+
+    def list_file_names(self, remote_dpath: str) -> list:
+        return [
+            f"{remote_dpath}/{fname}" for fname in list_remote_file_names(self.user_name,
+                    self.repo_name, remote_dpath, self.read_access_token)
+        ]
+
+    def push_files(self, access_token: str, local_fpaths: list, remote_dpaths: list) -> None:
+        push_files(
+            access_token=access_token,
+            repo_name=self.repo_name,
+            from_local_fpaths=local_fpaths,
+            to_remote_dpaths=remote_dpaths
+        )
+
+    def read_file_version(self, remote_fpath: str) -> tuple:
+        return read_remote_blob(self.user_name, self.repo_name, remote_fpath,
+                self.read_access_token)
+
+    def write_files(self, access_token: str, contents: dict,
+        expected_versions: dict = None) -> None:
+        push_contents(self.user_name, self.repo_name, access_token, contents,
+                f"Update {len(contents)} registry file(s)", expected_versions)
+
+    def delete_files(self, access_token: str, remote_fpaths: list) -> None:
+        # The Git Data API rejects deletions of paths missing from the base tree
+        remote_fpaths = self.existing_files(remote_fpaths)
+
+        if len(remote_fpaths) > 0:
+            push_contents(self.user_name, self.repo_name, access_token,
+                    dict.fromkeys(remote_fpaths), f"Delete {len(remote_fpaths)} registry file(s)")
+
+    def push_directory(self, access_token: str, local_dpath: str, remote_dpath: str) -> None:
+        push_directory(
+            access_token=access_token,
+            repo_name=self.repo_name,
+            from_local_dpath=local_dpath,
+            to_remote_dpath=remote_dpath,
+            timeout=120
+        )
+
+class LocalStorage(Storage):
+    """
+    Registry kept in a local (or network-mounted) directory. Files are replaced
+    atomically, and the etag of a file is its inode, modification time and size.
+    Compare-and-swap writes hold a POSIX lock on a lock file in root_dpath.
+    """
+    def __init__(self, root_dpath: str):
+        self.root_dpath = os.path.abspath(root_dpath)
+        self.name = f"local:{self.root_dpath}"
+
+    def local_path(self, remote_path: str) -> str:
+        return os.path.join(self.root_dpath, *remote_path.split('/'))
+
+    def file_etag(self, remote_fpath: str) -> str:
+        return stat_etag(os.stat(self.local_path(remote_fpath)))
+
+    def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+        with open(self.local_path(remote_fpath), 'rb') as local_file:
+            # Files are replaced rather than rewritten, so the open file keeps its etag
+            local_etag = stat_etag(os.fstat(local_file.fileno()))
+
+            if local_etag == etag:
+                return None, etag
+
+            return local_file.read(), local_etag
+
+    def list_directory(self, remote_dpath: str) -> list:
+        local_dpath = self.local_path(remote_dpath)
+
+        if not os.path.isdir(local_dpath):
+            raise FileNotFoundError(local_dpath)
+
+        return [
+            '/'.join([remote_dpath, *os.path.relpath(os.path.join(dpath, fname),
+                    local_dpath).split(os.sep)])
+            for dpath, _, fnames in os.walk(local_dpath) for fname in fnames
+        ]
+
+    def push_files(self, access_token: str, local_fpaths: list, remote_dpaths: list) -> None:
+        for local_fpath, remote_dpath in zip(local_fpaths, remote_dpaths):
+            to_local_dpath = self.local_path(remote_dpath)
+            os.makedirs(to_local_dpath, exist_ok=True)
+
+            # Copy-then-rename so that concurrent readers never see partial files
+            to_local_fpath = os.path.join(to_local_dpath, os.path.basename(local_fpath))
+            temp_fpath = f"{to_local_fpath}.{uuid.uuid4().hex}.tmp"
+            shutil.copyfile(local_fpath, temp_fpath)
+            os.replace(temp_fpath, to_local_fpath)
+
+    def write_files(self, access_token: str, contents: dict,
+        expected_versions: dict = None) -> None:
+        if not expected_versions:
+            return self.replace_files(contents)
+
+        os.makedirs(self.root_dpath, exist_ok=True)
+
+        # POSIX locks exclude other processes only, so threads also take a local lock
+        with local_write_lock, \
+                open(os.path.join(self.root_dpath, LOCAL_LOCK_FNAME), 'a') as lock_file:
+            fcntl.lockf(lock_file, fcntl.LOCK_EX)
+
+            try:
+                for remote_fpath, expected_version in expected_versions.items():
+                    try:
+                        version = self.file_etag(remote_fpath)
+                    except FileNotFoundError:
+                        version = None
+
+                    if version != expected_version:
+                        raise ConflictError(remote_fpath)
+
+                self.replace_files(contents)
+            finally:
+                fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+    def delete_files(self, access_token: str, remote_fpaths: list) -> None:
+        for remote_fpath in remote_fpaths:
+            try:
+                os.remove(self.local_path(remote_fpath))
+            except FileNotFoundError:
+                pass
+
+    def replace_files(self, contents: dict) -> None:
+        for remote_fpath, content in contents.items():
+            to_local_fpath = self.local_path(remote_fpath)
+            os.makedirs(os.path.dirname(to_local_fpath), exist_ok=True)
+
+            # Write-then-rename so that concurrent readers never see partial files
+            temp_fpath = f"{to_local_fpath}.{uuid.uuid4().hex}.tmp"
+
+            with open(temp_fpath, 'wb') as temp_file:
+                temp_file.write(content)
+
+            os.replace(temp_fpath, to_local_fpath)
+
+class BareGitStorage(Storage):
+    """
+    Registry kept in a local bare git repository, written through git plumbing
+    commands so that every push is a single commit on branch. The etag of a file
+    is its blob SHA.
+    """
+    def __init__(self, repo_dpath: str, branch: str = "main",
+        author_name: str = "mlgit", author_email: str = "mlgit@localhost"):
+        self.repo_dpath = os.path.abspath(repo_dpath)
+        self.branch = branch
+        self.name = f"git:{self.repo_dpath}@{branch}"
+        self.git_env = dict(os.environ,
+            GIT_AUTHOR_NAME=author_name, GIT_AUTHOR_EMAIL=author_email,
+            GIT_COMMITTER_NAME=author_name, GIT_COMMITTER_EMAIL=author_email
+        )
+
+        if not os.path.exists(self.repo_dpath):
+            self.git("init", "--bare", "--quiet", self.repo_dpath, git_dir=False)
+
+    def git(self, *args, git_dir: bool = True, env: dict = None, input: bytes = None) -> bytes:
+        command = ["git", f"--git-dir={self.repo_dpath}"] if git_dir else ["git"]
+
+        return subprocess.run(command + list(args), input=input, env=env or self.git_env,
+                check=True, capture_output=True).stdout
+
+    def head_commit(self) -> str:
+        try:
+            return self.git("rev-parse", "--verify", "--quiet",
+                    f"refs/heads/{self.branch}").decode().strip()
+        except subprocess.CalledProcessError:
+            return None
+
+    def blob_sha(self, commit: str, remote_fpath: str) -> str:
+        if commit is None:
+            return None
+
+        try:
+            return self.git("rev-parse", f"{commit}:{remote_fpath}").decode().strip()
+        except subprocess.CalledProcessError:
+            return None
+
+    def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+        blob_sha = self.blob_sha(self.head_commit(), remote_fpath)
+
+        if blob_sha is None:
+            raise FileNotFoundError(remote_fpath)
+
+        if blob_sha == etag:
+            return None, etag
+
+        return self.git("cat-file", "blob", blob_sha), blob_sha
+
+    def list_directory(self, remote_dpath: str) -> list:
+        if self.head_commit() is None:
+            raise FileNotFoundError(remote_dpath)
+
+        remote_fpaths = self.git("ls-tree", "-r", "--name-only", f"refs/heads/{self.branch}",
+                "--", f"{remote_dpath}/").decode().splitlines()
+
+        if len(remote_fpaths) == 0:
+            raise FileNotFoundError(remote_dpath)
+
+        return remote_fpaths
+
+    def push_files(self, access_token: str, local_fpaths: list, remote_dpaths: list) -> None:
+        if len(local_fpaths) == 0:
+            return
+
+        blob_shas = self.git("hash-object", "-w", "--stdin-paths",
+                input='\n'.join(local_fpaths).encode()).decode().split()
+
+        self.commit_blobs({
+            f"{remote_dpath}/{os.path.basename(local_fpath)}": blob_sha
+            for blob_sha, local_fpath, remote_dpath in zip(blob_shas, local_fpaths, remote_dpaths)
+        })
+
+    def write_files(self, access_token: str, contents: dict,
+        expected_versions: dict = None) -> None:
+        self.commit_blobs({
+            remote_fpath: self.git("hash-object", "-w", "--stdin", input=content).decode().strip()
+            for remote_fpath, content in contents.items()
+        }, expected_versions)
+
+    def delete_files(self, access_token: str, remote_fpaths: list) -> None:
+        if self.head_commit() is not None:
+            self.commit_blobs(dict.fromkeys(remote_fpaths))
+
+    def commit_blobs(self, blob_shas: dict, expected_versions: dict = None) -> None:
+        """
+        Commits blob_shas, a mapping of remote file paths to blob SHAs already in
+        the object database (None: delete the file), as a single commit on branch.
+        expected_versions is checked against the parent commit, and the branch
+        update itself is a compare-and-swap, so no other commit can slip in between.
+        """
+        if len(blob_shas) == 0:
+            return
+
+        # Mode 0 removes the path from the index
+        index_info = ''.join(
+            f"0 {'0' * 40}\t{remote_fpath}\n" if blob_sha is None else
+                    f"100644 blob {blob_sha}\t{remote_fpath}\n"
+            for remote_fpath, blob_sha in blob_shas.items()
+        ).encode()
+
+        # Rebuilds the commit on top of the new branch head when another writer
+        # moved the branch in between
+        for attempt in range(PUSH_ATTEMPTS):
+            parent_commit = self.head_commit()
+
+            for remote_fpath, expected_version in (expected_versions or {}).items():
+                if self.blob_sha(parent_commit, remote_fpath) != expected_version:
+                    raise ConflictError(remote_fpath)
+
+            try:
+                self.commit_index_info(index_info, parent_commit, len(blob_shas))
+                return
+            except subprocess.CalledProcessError:
+                if attempt == PUSH_ATTEMPTS - 1:
+                    raise
+
+            time.sleep(random.uniform(0, PUSH_BACKOFF * 2 ** attempt))
+
+    def commit_index_info(self, index_info: bytes, parent_commit: str, nfiles: int) -> None:
+        index_fd, index_fpath = tempfile.mkstemp(prefix="mlgit_index_")
+        os.close(index_fd)
+        os.remove(index_fpath)
+        env = dict(self.git_env, GIT_INDEX_FILE=index_fpath)
+
+        try:
+            if parent_commit is not None:
+                self.git("read-tree", parent_commit, env=env)
+
+            self.git("update-index", "--index-info", env=env, input=index_info)
+            tree_sha = self.git("write-tree", env=env).decode().strip()
+        finally:
+            if os.path.exists(index_fpath):
+                os.remove(index_fpath)
+
+        parent_args = [] if parent_commit is None else ["-p", parent_commit]
+        commit_sha = self.git("commit-tree", tree_sha, *parent_args,
+                "-m", f"Update {nfiles} registry file(s)").decode().strip()
+
+        # Compare-and-swap: fails when another writer moved the branch
+        self.git("update-ref", f"refs/heads/{self.branch}", commit_sha,
+                parent_commit or "0" * 40)
@@ -0,0 +1,124 @@
+import threading
+
+from mlgit.artifact_cache import ArtifactCache
+
+def test_put_get_and_revision(tmp_path) -> None:
+    artifact_cache = ArtifactCache(str(tmp_path))
+    artifact_cache.put("key", b"content", "r1")
+
+    assert artifact_cache.get("key") == b"content"
+    assert artifact_cache.get("key", "r1") == b"content"
+    assert artifact_cache.get("key", "r2") is None
+
+def test_concurrent_puts_of_one_entry_from_threads(tmp_path) -> None:
+    artifact_cache = ArtifactCache(str(tmp_path))
+    errors = []
+
+    def put(thread_idx: int) -> None:
+        try:
+            for _ in range(50):
+                artifact_cache.put("key", bytes([thread_idx]) * 2 ** 16)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=put, args=(thread_idx,)) for thread_idx in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(artifact_cache.get("key"))) == 1
+    assert [fname for fname in tmp_path.iterdir() if fname.suffix == ".tmp"] == []
+
+def test_evicts_least_recently_used_entries(tmp_path) -> None:
+    artifact_cache = ArtifactCache(str(tmp_path), max_bytes=250)
+
+    for key in ["a", "b", "c"]:
+        artifact_cache.put(key, b"x" * 100)
+
+    assert artifact_cache.get("a") is None
+    assert artifact_cache.get("c") == b"x" * 100
+
+def test_puts_only_scan_the_cache_when_over_max_bytes(tmp_path, monkeypatch) -> None:
+    artifact_cache = ArtifactCache(str(tmp_path), max_bytes=10_000)
+    scans = []
+    scan_entries = artifact_cache.scan_entries
+    monkeypatch.setattr(artifact_cache, "scan_entries", lambda: scans.append(1) or scan_entries())
+
+    for key_idx in range(200):
+        artifact_cache.put(f"key_{key_idx}", b"x" * 100)
+
+    # The first put scans, then every put crossing max_bytes after an eviction
+    assert len(scans) <= 15
+    assert sum(fpath.stat().st_size for fpath in tmp_path.glob("*.bin")) <= 10_000
+    assert artifact_cache.get("key_199") == b"x" * 100
+
+def test_total_bytes_follows_overwrites_and_invalidations(tmp_path) -> None:
+    artifact_cache = ArtifactCache(str(tmp_path))
+    artifact_cache.put("a", b"x" * 100)
+    artifact_cache.put("a", b"x" * 40)
+    artifact_cache.put("b", b"x" * 10)
+    artifact_cache.invalidate("b")
+
+    assert artifact_cache.total_bytes == 40
+
+def test_concurrent_fillers_never_pair_contents_with_another_revision(tmp_path) -> None:
+    artifact_cache = ArtifactCache(str(tmp_path))
+    mismatches = []
+    done = threading.Event()
+
+    def fill(thread_idx: int) -> None:
+        for put_idx in range(100):
+            revision = f"r{thread_idx}_{put_idx}"
+            artifact_cache.put("key", revision.encode() * 1000, revision)
+
+    def read() -> None:
+        while not done.is_set():
+            metadata = artifact_cache.get_metadata("key")
+
+            if metadata is None:
+                continue
+
+            try:
+                content = artifact_cache.read_content("key", metadata)
+            except Exception as error:
+                mismatches.append(error)
+                return
+
+            if content is not None and content != metadata["revision"].encode() * 1000:
+                mismatches.append(metadata["revision"])
+
+    fillers = [threading.Thread(target=fill, args=(thread_idx,)) for thread_idx in range(4)]
+    readers = [threading.Thread(target=read) for _ in range(2)]
+
+    for thread in fillers + readers:
+        thread.start()
+
+    for thread in fillers:
+        thread.join()
+
+    done.set()
+
+    for thread in readers:
+        thread.join()
+
+    metadata = artifact_cache.get_metadata("key")
+
+    assert mismatches == []
+    assert artifact_cache.get("key", metadata["revision"]) == metadata["revision"].encode() * 1000
+
+def test_invalidate_keeps_an_entry_replaced_since_its_metadata_was_read(tmp_path) -> None:
+    artifact_cache = ArtifactCache(str(tmp_path))
+    artifact_cache.put("key", b"old", "r1")
+    metadata = artifact_cache.get_metadata("key")
+    artifact_cache.put("key", b"new", "r2")
+
+    assert artifact_cache.read_content("key", metadata) is None
+
+    artifact_cache.invalidate("key", metadata)
+
+    assert artifact_cache.get("key", "r2") == b"new"
+    assert len(list(tmp_path.glob("*.bin"))) == 1
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlgit.backtest import filter_backtest, merge_backtests, overlaps_backtest_range
+
+def reference_merge(prior_model_backtest: pd.DataFrame, model_backtest: pd.DataFrame,
+    version_timestamp: pd.Timestamp) -> pd.DataFrame:
+    """
+    Applies the precedence rules of merge_backtests one row at a time.
+    """
+    columns = list(prior_model_backtest.columns)
+    rows = dict(zip(prior_model_backtest.index,
+            zip(*[prior_model_backtest[column].tolist() for column in columns])))
+
+    for date, row in zip(model_backtest.index,
+            zip(*[model_backtest[column].tolist() for column in columns])):
+        prior_row = rows.get(date)
+
+        if prior_row is None:
+            rows[date] = row
+            continue
+
+        prior_version_timestamp = prior_row[columns.index("version_timestamp")]
+
+        if prior_version_timestamp == version_timestamp or \
+                (date <= version_timestamp and prior_version_timestamp > version_timestamp) or \
+                (date > version_timestamp and prior_version_timestamp < version_timestamp):
+            rows[date] = row
+
+    dates = sorted(rows)
+    reference_backtest = pd.DataFrame([rows[date] for date in dates], columns=columns,
+            index=pd.DatetimeIndex(dates, name=prior_model_backtest.index.name))
+    reference_backtest["version_timestamp"] = \
+            pd.to_datetime(reference_backtest["version_timestamp"])
+
+    return reference_backtest
+
+def make_backtests(nrows: int, freq: str, seed: int) -> tuple:
+    """
+    Returns (prior_model_backtest, model_backtest, version_timestamp) overlapping on
+    about half their dates, with prior rows from older, equal and newer versions.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-01", periods=nrows, freq=freq, name="date")
+    version_timestamp = dates[nrows * 3 // 4]
+    prior_version_timestamps = np.array([dates[nrows // 4], version_timestamp, dates[-1]],
+            dtype="datetime64[ns]")
+
+    prior_model_backtest = pd.DataFrame({
+        "prediction": rng.normal(size=nrows),
+        "version_timestamp": prior_version_timestamps[rng.integers(0, 3, nrows)]
+    }, index=dates)
+
+    new_dates = dates[nrows // 2:].append(
+            pd.date_range(dates[-1], periods=nrows // 4 + 1, freq=freq, name="date")[1:])
+    model_backtest = pd.DataFrame({
+        "prediction": rng.normal(size=len(new_dates)),
+        "version_timestamp": version_timestamp
+    }, index=new_dates)
+    model_backtest["version_timestamp"] = \
+            model_backtest["version_timestamp"].astype("datetime64[ns]")
+
+    return prior_model_backtest, model_backtest, version_timestamp
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_backtests_matches_reference(seed: int) -> None:
+    prior_model_backtest, model_backtest, version_timestamp = \
+            make_backtests(1_000, "D", seed)
+
+    pd.testing.assert_frame_equal(
+        merge_backtests(prior_model_backtest, model_backtest, version_timestamp),
+        reference_merge(prior_model_backtest, model_backtest, version_timestamp),
+        check_freq=False
+    )
+
+def test_merge_backtests_matches_reference_on_millions_of_rows() -> None:
+    # Several years of minutely predictions
+    prior_model_backtest, model_backtest, version_timestamp = \
+            make_backtests(2_000_000, "min", 0)
+
+    pd.testing.assert_frame_equal(
+        merge_backtests(prior_model_backtest, model_backtest, version_timestamp),
+        reference_merge(prior_model_backtest, model_backtest, version_timestamp),
+        check_freq=False
+    )
+
+def test_merge_backtests_leaves_inputs_unchanged() -> None:
+    prior_model_backtest, model_backtest, version_timestamp = make_backtests(100, "D", 0)
+    prior_copy, model_copy = prior_model_backtest.copy(), model_backtest.copy()
+
+    merge_backtests(prior_model_backtest, model_backtest, version_timestamp)
+
+    pd.testing.assert_frame_equal(prior_model_backtest, prior_copy)
+    pd.testing.assert_frame_equal(model_backtest, model_copy)
+
+def test_filter_backtest() -> None:
+    prior_model_backtest, _, version_timestamp = make_backtests(100, "D", 0)
+    filtered_backtest = filter_backtest(prior_model_backtest, "2015-01-10", "2015-02-10",
+            version_timestamp)
+
+    assert filtered_backtest.index.min() >= pd.Timestamp("2015-01-10")
+    assert filtered_backtest.index.max() <= pd.Timestamp("2015-02-10")
+    assert (filtered_backtest["version_timestamp"] == version_timestamp).all()
+
+def test_overlaps_backtest_range() -> None:
+    backtest_segment = {"start": "2020-01-01", "end": "2020-12-31"}
+
+    assert overlaps_backtest_range(backtest_segment)
+    assert overlaps_backtest_range(backtest_segment, "2020-06-01", "2021-06-01")
+    assert not overlaps_backtest_range(backtest_segment, "2021-01-01")
+    assert not overlaps_backtest_range(backtest_segment, None, "2019-12-31")
@@ -0,0 +1,48 @@
+import io
+import random
+
+import pytest
+
+from mlgit.chunks import CDC_MIN_CHUNK_BYTES, iter_content_defined_chunks, \
+        iter_fixed_chunks, make_chunks_manifest, validate_chunk_bytes
+
+def make_content(nbytes: int, seed: int = 0) -> bytes:
+    return random.Random(seed).randbytes(nbytes)
+
+def test_fixed_chunks_cover_the_content() -> None:
+    content = make_content(10_000)
+    chunks = list(iter_fixed_chunks(io.BytesIO(content), 1024))
+
+    assert b''.join(chunks) == content
+    assert [len(chunk) for chunk in chunks] == [1024] * 9 + [784]
+
+@pytest.mark.parametrize("avg_chunk_bytes", [CDC_MIN_CHUNK_BYTES, 1024, 2 ** 16])
+def test_content_defined_chunks_cover_the_content(avg_chunk_bytes: int) -> None:
+    content = make_content(2 ** 20)
+    chunks = list(iter_content_defined_chunks(io.BytesIO(content), avg_chunk_bytes))
+
+    assert b''.join(chunks) == content
+    assert max(len(chunk) for chunk in chunks) <= 4 * avg_chunk_bytes
+
+def test_content_defined_chunks_survive_insertions() -> None:
+    content = make_content(2 ** 20)
+    edited_content = content[:2 ** 19] + b"inserted" + content[2 ** 19:]
+    chunks = set(iter_content_defined_chunks(io.BytesIO(content), 4096))
+    edited_chunks = list(iter_content_defined_chunks(io.BytesIO(edited_content), 4096))
+
+    assert sum(chunk not in chunks for chunk in edited_chunks) <= 3
+
+@pytest.mark.parametrize("chunk_bytes, content_defined", [
+    (0, False), (-1, False), (1.5, False), (1, True), (49, True), (CDC_MIN_CHUNK_BYTES - 1, True)
+])
+def test_invalid_chunk_sizes_are_rejected(chunk_bytes: any, content_defined: bool) -> None:
+    with pytest.raises(ValueError):
+        validate_chunk_bytes(chunk_bytes, content_defined)
+
+def test_make_chunks_manifest(tmp_path) -> None:
+    fpath = tmp_path / "model"
+    fpath.write_bytes(make_content(5000))
+    chunks_manifest = make_chunks_manifest(str(fpath), 2048)
+
+    assert chunks_manifest["size"] == 5000
+    assert [chunk_size for _, chunk_size in chunks_manifest["chunks"]] == [2048, 2048, 904]
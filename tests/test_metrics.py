@@ -0,0 +1,28 @@
+from mlgit.metrics import CounterSink, instrument
+
+def test_counter_sink_renders_counters_per_operation() -> None:
+    counter_sink = CounterSink()
+
+    for nbytes in [10, 20]:
+        with instrument(counter_sink, "read_artifact", "model/versions.json") as operation_record:
+            operation_record["bytes"] = nbytes
+            operation_record["cache_hits"] = 1
+
+    try:
+        with instrument(counter_sink, "write_files"):
+            raise TimeoutError()
+    except TimeoutError:
+        pass
+
+    lines = counter_sink.render().splitlines()
+
+    assert 'mlgit_operations_total{operation="read_artifact"} 2' in lines
+    assert 'mlgit_bytes_total{operation="read_artifact"} 30' in lines
+    assert 'mlgit_cache_hits_total{operation="read_artifact"} 2' in lines
+    assert 'mlgit_errors_total{operation="read_artifact"} 0' in lines
+    assert 'mlgit_errors_total{operation="write_files"} 1' in lines
+    # One TYPE line per counter, ahead of its samples
+    assert lines.count("# TYPE mlgit_bytes_total counter") == 1
+    assert lines.index("# TYPE mlgit_bytes_total counter") + 1 == \
+            lines.index('mlgit_bytes_total{operation="read_artifact"} 30')
+    assert counter_sink.get("mlgit_retries_total", "write_files") == 0
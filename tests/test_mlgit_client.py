@@ -0,0 +1,589 @@
+import threading
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyutils")
+
+from pyutils.pickable import PickableObject
+
+from mlgit.mlgit_client import MLGitClient
+from mlgit.storage import LocalStorage
+
+class SlowReadStorage(LocalStorage):
+    """
+    LocalStorage widening the window between reading and writing a file.
+    """
+    def read_file_version(self, remote_fpath: str) -> tuple:
+        content, version = super().read_file_version(remote_fpath)
+        threading.Event().wait(0.05)
+
+        return content, version
+
+class Model(PickableObject):
+    def __init__(self, weights: list = None):
+        self.weights = weights or [0.0]
+
+def make_client(remote_dpath: str, storage: LocalStorage = None, **client_kwargs) -> MLGitClient:
+    return MLGitClient(None, None, "registry",
+            storage=storage or LocalStorage(remote_dpath), **client_kwargs)
+
+def run_threads(target: callable, nthreads: int) -> None:
+    errors = []
+
+    def run(thread_idx: int) -> None:
+        try:
+            target(thread_idx)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(thread_idx,)) for thread_idx in range(nthreads)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+def test_log_model_version_round_trip(tmp_path) -> None:
+    client = make_client(tmp_path)
+    client.log_model_version("token", Model([1.0, 2.0]), "model", "v1")
+
+    assert client.get_version_list("model") == ["v1"]
+    assert make_client(tmp_path).get_model_version("model", "v1").weights == [1.0, 2.0]
+
+def test_concurrent_versions_of_one_model_are_all_listed(tmp_path) -> None:
+    storage = SlowReadStorage(tmp_path)
+
+    run_threads(lambda thread_idx: make_client(tmp_path, storage).log_model_version(
+            "token", Model(), "model", f"v{thread_idx}"), 12)
+
+    assert sorted(make_client(tmp_path).get_version_list("model")) == \
+            sorted(f"v{thread_idx}" for thread_idx in range(12))
+
+def test_concurrent_versions_of_unrelated_models_never_conflict(tmp_path) -> None:
+    storage = SlowReadStorage(tmp_path)
+
+    run_threads(lambda thread_idx: make_client(tmp_path, storage).log_model_version(
+            "token", Model(), f"model_{thread_idx}", "v1"), 24)
+
+    client = make_client(tmp_path)
+
+    assert sorted(client.list_models()) == sorted(f"model_{thread_idx}" for thread_idx in range(24))
+    assert all(client.get_version_list(f"model_{thread_idx}") == ["v1"]
+            for thread_idx in range(24))
+
+def test_writers_append_to_the_version_head_whatever_segment_versions(tmp_path) -> None:
+    plain_client = make_client(tmp_path)
+    segmented_client = make_client(tmp_path, segment_versions=True)
+
+    plain_client.log_model_version("token", Model(), "model", "v1")
+    segmented_client.log_model_version("token", Model(), "model", "v2")
+    plain_client.log_model_version("token", Model(), "model", "v3")
+
+    assert plain_client.get_version_list("model") == ["v1", "v2", "v3"]
+    assert plain_client.get_latest_version("model") == "v3"
+
+def test_version_segments_pages_and_since(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("mlgit.mlgit_client.VERSION_SEGMENT_SIZE", 4)
+    client = make_client(tmp_path, segment_versions=True)
+    model_versions = [f"v{version_idx}" for version_idx in range(11)]
+
+    for model_version in model_versions:
+        client.log_model_version("token", Model(), "model", model_version)
+
+    assert client.get_version_list("model") == model_versions
+    assert client.get_version_count("model") == 11
+    assert client.get_latest_version("model") == "v10"
+
+    for offset in range(13):
+        for limit in range(6):
+            assert client.get_versions_page("model", offset, limit) == \
+                    model_versions[offset:offset + limit]
+
+    for version_idx, model_version in enumerate(model_versions):
+        assert list(client.iter_versions("model", since=model_version)) == \
+                model_versions[version_idx + 1:]
+
+    with pytest.raises(ValueError):
+        list(client.iter_versions("model", since="unknown"))
+
+def test_concurrent_migration_keeps_every_version(tmp_path) -> None:
+    storage = SlowReadStorage(tmp_path)
+    make_client(tmp_path).log_model_version("token", Model(), "model", "v0")
+
+    run_threads(lambda thread_idx: make_client(tmp_path, storage,
+            segment_versions=thread_idx % 2 == 0).log_model_version(
+                    "token", Model(), "model", f"v{thread_idx + 1}"), 8)
+
+    assert sorted(make_client(tmp_path).get_version_list("model")) == \
+            sorted(f"v{version_idx}" for version_idx in range(9))
+
+def test_register_model_resets_either_layout(tmp_path) -> None:
+    make_client(tmp_path, segment_versions=True).log_model_version("token", Model(), "model", "v1")
+    make_client(tmp_path).register_model("token", "model")
+
+    assert make_client(tmp_path).get_version_list("model") == []
+    assert make_client(tmp_path).get_latest_version("model") is None
+
+def test_manifest_keeps_one_entry_per_model(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("mlgit.mlgit_client.VERSION_SEGMENT_SIZE", 2)
+    client = make_client(tmp_path, segment_versions=True)
+
+    for model_version in ["v1", "v2", "v3"]:
+        client.log_model_version("token", Model(), "model", model_version)
+
+    model_entry = client.get_registry_manifest()["models"]["model"]
+
+    assert (model_entry["latest"], model_entry["count"]) == ("v3", 3)
+    assert model_entry["timestamp"] is not None
+    assert [version_entry["version"] for version_entry in client.iter_version_entries("model")] \
+            == ["v1", "v2", "v3"]
+    assert all("model" in version_entry["artifacts"] and version_entry["serializer"] == "pickable"
+            for version_entry in client.iter_version_entries("model"))
+
+def test_batches_of_different_threads_are_independent(tmp_path) -> None:
+    client = make_client(tmp_path)
+    second_batch_entered = threading.Event()
+    first_batch_exited = threading.Event()
+
+    def log_batch(thread_idx: int) -> None:
+        with client.batch_logging("token"):
+            client.log_json_artifact("token", {"before": thread_idx}, "before", f"model_{thread_idx}")
+
+            if thread_idx == 0:
+                second_batch_entered.wait(10)
+                return
+
+            second_batch_entered.set()
+            first_batch_exited.wait(10)
+            client.log_json_artifact("token", {"after": thread_idx}, "after", f"model_{thread_idx}")
+
+            # Still staged, not published, after the other thread's batch exited
+            assert not (tmp_path / "registry" / "model_1" / "after.json").exists()
+
+    def run_batch(thread_idx: int) -> None:
+        try:
+            log_batch(thread_idx)
+        finally:
+            if thread_idx == 0:
+                first_batch_exited.set()
+
+    run_threads(run_batch, 2)
+
+    assert client.get_json_artifact("before", "model_0") == {"before": 0}
+    assert client.get_json_artifact("before", "model_1") == {"before": 1}
+    assert client.get_json_artifact("after", "model_1") == {"after": 1}
+
+def test_batch_does_not_conflict_on_the_manifest_with_unrelated_models(tmp_path) -> None:
+    client = make_client(tmp_path)
+
+    with client.batch_logging("token"):
+        client.log_model_version("token", Model(), "mine", "v1")
+        make_client(tmp_path).log_model_version("token", Model(), "other", "v1")
+
+    registry_manifest = make_client(tmp_path).get_registry_manifest()
+
+    assert make_client(tmp_path).get_version_list("mine") == ["v1"]
+    assert sorted(registry_manifest["models"]) == ["mine", "other"]
+    assert registry_manifest["models"]["mine"]["latest"] == "v1"
+
+def make_backtest(start: str, nrows: int, value: float) -> pd.DataFrame:
+    return pd.DataFrame({"prediction": [value] * nrows},
+            index=pd.date_range(start, periods=nrows, freq="D", name="date"))
+
+def test_compact_backtest_keeps_segments_logged_during_compaction(tmp_path) -> None:
+    class InterleavingStorage(LocalStorage):
+        """
+        LocalStorage logging one more segment while the compacted backtest is read.
+        """
+        interleaved = False
+
+        def read_file_version(self, remote_fpath: str) -> tuple:
+            if remote_fpath.endswith("backtest.csv") and not self.interleaved:
+                self.interleaved = True
+                make_client(tmp_path, segment_backtests=True).log_model_backtest("token",
+                        make_backtest("2000-01-11", 5, 2.0), "model", "2000-01-16")
+
+            return super().read_file_version(remote_fpath)
+
+    client = make_client(tmp_path, segment_backtests=True)
+    client.log_model_backtest("token", make_backtest("2000-01-01", 10, 1.0), "model",
+            "2000-01-11")
+    make_client(tmp_path, InterleavingStorage(tmp_path),
+            segment_backtests=True).compact_backtest("token", "model")
+
+    model_backtest = make_client(tmp_path, segment_backtests=True).get_model_backtest("model")
+
+    assert len(model_backtest) == 15
+    assert make_client(tmp_path, segment_backtests=True).get_backtest_segments("model") == []
+
+def test_compact_backtest_deletes_the_compacted_segments(tmp_path) -> None:
+    client = make_client(tmp_path, segment_backtests=True)
+    client.log_model_backtest("token", make_backtest("2000-01-01", 10, 1.0), "model",
+            "2000-01-11")
+    client.log_model_backtest("token", make_backtest("2000-01-11", 5, 2.0), "model",
+            "2000-01-16")
+    segments_dpath = tmp_path / "registry" / "model" / "backtest_segments"
+
+    assert len(list(segments_dpath.iterdir())) == 2
+
+    client.compact_backtest("token", "model")
+
+    assert list(segments_dpath.iterdir()) == []
+    assert len(make_client(tmp_path, segment_backtests=True).get_model_backtest("model")) == 15
+
+def test_backtest_reads_survive_a_compaction_after_the_segment_index_was_read(tmp_path) -> None:
+    class CompactingStorage(LocalStorage):
+        """
+        LocalStorage compacting the backtest once the segment index was read.
+        """
+        compacted = False
+
+        def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+            result = super().read_file(remote_fpath, etag)
+
+            if remote_fpath.endswith("backtest_segments.json") and not self.compacted:
+                self.compacted = True
+                make_client(tmp_path, segment_backtests=True).compact_backtest("token", "model")
+
+            return result
+
+    make_client(tmp_path, segment_backtests=True).log_model_backtest("token",
+            make_backtest("2000-01-01", 10, 1.0), "model", "2000-01-11")
+    client = make_client(tmp_path, CompactingStorage(tmp_path), segment_backtests=True)
+
+    assert client.get_model_backtest("model")["prediction"].tolist() == [1.0] * 10
+
+def test_compact_backtest_within_batch_logging_deletes_segments_once_published(
+    tmp_path) -> None:
+    client = make_client(tmp_path, segment_backtests=True)
+    client.log_model_backtest("token", make_backtest("2000-01-01", 10, 1.0), "model",
+            "2000-01-11")
+    segments_dpath = tmp_path / "registry" / "model" / "backtest_segments"
+
+    with pytest.raises(RuntimeError):
+        with client.batch_logging("token"):
+            client.compact_backtest("token", "model")
+            raise RuntimeError()
+
+    assert len(list(segments_dpath.iterdir())) == 1
+
+    with client.batch_logging("token"):
+        client.compact_backtest("token", "model")
+
+        assert len(list(segments_dpath.iterdir())) == 1
+
+    assert list(segments_dpath.iterdir()) == []
+    assert len(make_client(tmp_path, segment_backtests=True).get_model_backtest("model")) == 10
+
+def test_compact_backtest_requires_segment_backtests(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        make_client(tmp_path).compact_backtest("token", "model")
+
+def test_segment_index_read_errors_are_not_taken_for_no_segments(tmp_path) -> None:
+    class UnreachableIndexStorage(LocalStorage):
+        def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+            if remote_fpath.endswith("backtest_segments.json"):
+                raise TimeoutError(remote_fpath)
+
+            return super().read_file(remote_fpath, etag)
+
+    make_client(tmp_path, segment_backtests=True).log_model_backtest("token",
+            make_backtest("2000-01-01", 10, 1.0), "model", "2000-01-11")
+    client = make_client(tmp_path, UnreachableIndexStorage(tmp_path), segment_backtests=True,
+            download_retries=0)
+
+    with pytest.raises(TimeoutError):
+        client.get_model_backtest("model")
+
+def test_repeated_chunks_are_fetched_once(tmp_path) -> None:
+    class CountingStorage(LocalStorage):
+        object_reads = 0
+
+        def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+            if "/objects/" in remote_fpath:
+                self.object_reads += 1
+
+            return super().read_file(remote_fpath, etag)
+
+    make_client(tmp_path, model_chunk_bytes=1024).log_model_version("token",
+            Model(bytes(2 ** 16)), "model", "v1")
+    storage = CountingStorage(tmp_path)
+    model = make_client(tmp_path, storage, model_chunk_bytes=1024).get_model_version(
+            "model", "v1")
+
+    assert model.weights == bytes(2 ** 16)
+    assert storage.object_reads < 2 ** 16 // 1024
+
+def test_compressed_chunked_model_files_share_unchanged_chunks(tmp_path) -> None:
+    import random
+
+    # Compressible, so that compressing the whole file would shift every later chunk
+    rng = random.Random(0)
+    weights = bytearray(b"".join(rng.choice([b"alpha ", b"beta ", b"gamma "])
+            for _ in range(2 ** 14)))
+    client = make_client(tmp_path, compression="gzip", model_chunk_bytes=1024)
+    client.log_model_version("token", Model(bytes(weights)), "model", "v1")
+    object_count = len(list(tmp_path.glob("**/objects/*")))
+
+    weights[2 ** 15] ^= 0xff
+    client.log_model_version("token", Model(bytes(weights)), "model", "v2")
+
+    assert len(list(tmp_path.glob("**/objects/*"))) - object_count <= 2
+    assert make_client(tmp_path).get_model_version("model", "v2").weights == bytes(weights)
+
+def test_backtests_are_found_and_written_back_in_the_format_they_were_logged_in(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+
+    make_client(tmp_path, pandas_format="parquet").log_model_backtest("token",
+            make_backtest("2000-01-01", 10, 1.0), "model", "2000-01-11")
+    client = make_client(tmp_path)
+    client.log_model_backtest("token", make_backtest("2000-01-06", 10, 2.0), "model",
+            "2000-01-16")
+
+    assert len(client.get_model_backtest("model")) == 15
+    assert [fpath.name for fpath in tmp_path.glob("**/backtest.*")] == ["backtest.parquet"]
+
+def test_backtest_read_errors_do_not_start_a_new_backtest(tmp_path) -> None:
+    class UnreachableBacktestStorage(LocalStorage):
+        def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+            if "backtest" in remote_fpath:
+                raise TimeoutError(remote_fpath)
+
+            return super().read_file(remote_fpath, etag)
+
+    make_client(tmp_path).log_model_backtest("token", make_backtest("2000-01-01", 10, 1.0),
+            "model", "2000-01-11")
+    client = make_client(tmp_path, UnreachableBacktestStorage(tmp_path), download_retries=0)
+
+    with pytest.raises(TimeoutError):
+        client.log_model_backtest("token", make_backtest("2000-01-06", 10, 2.0), "model",
+                "2000-01-16")
+
+    assert len(make_client(tmp_path).get_model_backtest("model")) == 10
+
+def test_model_chunk_bytes_is_validated(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        make_client(tmp_path, model_chunk_bytes=49, content_defined_chunks=True)
+
+    with pytest.raises(ValueError):
+        make_client(tmp_path, model_chunk_bytes=0)
+
+def test_get_many_reuses_its_threads_across_calls(tmp_path) -> None:
+    client = make_client(tmp_path)
+
+    for model_name in ["a", "b"]:
+        client.log_json_artifact("token", [model_name], "versions", model_name)
+
+    thread_names = set()
+
+    def get_version_list(model_name: str) -> list:
+        thread_names.add(threading.current_thread().name)
+        return client.get_version_list(model_name)
+
+    for _ in range(5):
+        assert client.get_many(get_version_list, ["a", "b"], max_workers=2) == \
+                {"a": ["a"], "b": ["b"]}
+
+    assert len(thread_names) <= 2
+    client.close()
+
+def test_async_get_many_streams_results(tmp_path) -> None:
+    import asyncio
+
+    from mlgit.async_mlgit_client import AsyncMLGitClient
+
+    for model_name in ["a", "b", "c"]:
+        make_client(tmp_path).log_json_artifact("token", [model_name], "versions", model_name)
+
+    async def get_many() -> tuple:
+        async with AsyncMLGitClient(None, None, "registry",
+                storage=LocalStorage(tmp_path)) as client:
+            streamed = {model_name: version_list async for model_name, version_list in
+                    client.get_many_version_lists(["a", "b", "c"], stream=True)}
+
+            return streamed, await client.get_many_version_lists(["a", "b", "c"])
+
+    streamed, collected = asyncio.run(get_many())
+
+    assert streamed == collected == {"a": ["a"], "b": ["b"], "c": ["c"]}
+
+def test_async_version_iterators_segments_and_manifest_rebuild(tmp_path) -> None:
+    import asyncio
+
+    from mlgit.async_mlgit_client import AsyncMLGitClient
+
+    for model_version in ["v1", "v2", "v3"]:
+        make_client(tmp_path).log_model_version("token", Model(), "model", model_version)
+
+    make_client(tmp_path, segment_backtests=True).log_model_backtest("token",
+            make_backtest("2000-01-01", 5, 1.0), "model", "2000-01-06")
+
+    async def read_registry() -> tuple:
+        async with AsyncMLGitClient(None, None, "registry", storage=LocalStorage(tmp_path),
+                segment_backtests=True) as client:
+            await client.rebuild_registry_manifest("token", ["model"])
+
+            return [model_version async for model_version in client.iter_versions("model")], \
+                    [version_entry["version"] async for version_entry in
+                            client.iter_version_entries("model", since="v1")], \
+                    await client.get_backtest_segments("model"), \
+                    await client.get_registry_manifest()
+
+    model_versions, since_versions, backtest_segments, registry_manifest = \
+            asyncio.run(read_registry())
+
+    assert model_versions == ["v1", "v2", "v3"]
+    assert since_versions == ["v2", "v3"]
+    assert len(backtest_segments) == 1
+    assert registry_manifest["models"]["model"]["latest"] == "v3"
+
+def test_pull_remote_directory_counts_bytes_and_retries_of_every_file(tmp_path,
+    monkeypatch) -> None:
+    from mlgit.metrics import CallbackSink
+
+    class FlakyStorage(LocalStorage):
+        """
+        LocalStorage timing out on the first read of every file.
+        """
+        def __init__(self, root_dpath: str):
+            super().__init__(root_dpath)
+            self.failed_fpaths = set()
+            self.lock = threading.Lock()
+
+        def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+            with self.lock:
+                first_read = remote_fpath not in self.failed_fpaths
+                self.failed_fpaths.add(remote_fpath)
+
+            if first_read:
+                raise TimeoutError(remote_fpath)
+
+            return super().read_file(remote_fpath, etag)
+
+    monkeypatch.setattr("mlgit.github_api.time.sleep", lambda seconds: None)
+    LocalStorage(tmp_path / "remote").write_files("token", {
+        f"model/v1/file_{file_idx}.bin": b"x" * file_idx for file_idx in range(64)
+    })
+    records = []
+    client = make_client(tmp_path, FlakyStorage(tmp_path / "remote"), download_concurrency=16,
+            metrics_sink=CallbackSink(records.append))
+
+    client.pull_remote_directory("model/v1", str(tmp_path / "local"))
+    operation_record, = [record for record in records
+            if record["operation"] == "pull_directory"]
+
+    assert operation_record["files"] == 64
+    assert operation_record["bytes"] == sum(range(64))
+    assert operation_record["retries"] == 64
+    client.close()
+
+def test_track_latest_reports_failed_polls(tmp_path, caplog) -> None:
+    from mlgit.metrics import CallbackSink
+
+    class UnreachableStorage(LocalStorage):
+        def read_file(self, remote_fpath: str, etag: str = None) -> tuple:
+            raise TimeoutError(remote_fpath)
+
+    failed_polls = []
+    second_failed_poll = threading.Event() # Once the first failure is logged
+
+    def record(operation_record: dict) -> None:
+        if operation_record["operation"] == "track_latest" and \
+                operation_record["error"] == "TimeoutError":
+            failed_polls.append(operation_record)
+
+            if len(failed_polls) == 2:
+                second_failed_poll.set()
+
+    client = make_client(tmp_path, UnreachableStorage(tmp_path), download_retries=0,
+            model_cache_entries=1, metrics_sink=CallbackSink(record))
+
+    with caplog.at_level("WARNING", logger="mlgit"):
+        client.track_latest("model", poll_interval=0.01)
+        assert second_failed_poll.wait(5)
+        client.close()
+
+    assert any("Polling the latest version of model failed" in message
+            for message in caplog.messages)
+
+@pytest.mark.parametrize("segment_versions", [False, True])
+def test_version_entries_are_kept_in_either_layout(tmp_path, segment_versions: bool) -> None:
+    client = make_client(tmp_path, segment_versions=segment_versions)
+    client.log_model_version("token", Model(), "model", "v1")
+    client.log_model_version("token", Model(), "model", "v2")
+
+    version_entries = list(make_client(tmp_path).iter_version_entries("model"))
+
+    assert [version_entry["version"] for version_entry in version_entries] == ["v1", "v2"]
+    assert all(version_entry["timestamp"] is not None and
+            version_entry["serializer"] == "pickable" and "model" in version_entry["artifacts"]
+            for version_entry in version_entries)
+
+def test_versions_logged_without_entries_are_merged(tmp_path) -> None:
+    client = make_client(tmp_path)
+    client.log_json_artifact("token", ["v0"], "versions", "model") # As by older clients
+    client.log_model_version("token", Model(), "model", "v1")
+
+    version_entries = list(client.iter_version_entries("model"))
+
+    assert version_entries[0] == {"version": "v0"}
+    assert version_entries[1]["version"] == "v1" and "timestamp" in version_entries[1]
+    assert make_client(tmp_path, segment_versions=True).get_version_list("model") == \
+            ["v0", "v1"]
+
+def test_cloudpickle_models_are_kept_in_the_mmap_cache(tmp_path) -> None:
+    pytest.importorskip("cloudpickle")
+
+    make_client(tmp_path, model_serializer="cloudpickle").log_model_version("token",
+            {"f": lambda x: x + 1}, "model", "v1")
+    client = make_client(tmp_path, mmap_cache_dpath=str(tmp_path / "mmap"))
+
+    assert client.get_model_version("model", "v1")["f"](1) == 2
+    assert make_client(tmp_path, mmap_cache_dpath=str(tmp_path / "mmap")) \
+            .mmap_cache.get(client.mmap_cache_key("model", "v1"))["f"](1) == 2
+
+def test_models_the_mmap_cache_cannot_keep_are_still_served(tmp_path, monkeypatch) -> None:
+    from mlgit.mmap_cache import MmapModelCache
+
+    def put(self, key: str, model: any) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(MmapModelCache, "put", put)
+    make_client(tmp_path).log_model_version("token", Model([1.0]), "model", "v1")
+    client = make_client(tmp_path, mmap_cache_dpath=str(tmp_path / "mmap"))
+
+    assert client.get_model_version("model", "v1").weights == [1.0]
+
+@pytest.mark.parametrize("pandas_format", ["csv", "parquet"])
+@pytest.mark.parametrize("segment_backtests", [False, True])
+def test_backtests_logged_with_string_timestamps_filter_by_version(tmp_path,
+    pandas_format: str, segment_backtests: bool) -> None:
+    if pandas_format == "parquet":
+        pytest.importorskip("pyarrow")
+
+    client = make_client(tmp_path, pandas_format=pandas_format,
+            segment_backtests=segment_backtests)
+    client.log_model_backtest("token", make_backtest("2000-01-01", 10, 1.0), "model",
+            "2000-01-11")
+    client.log_model_backtest("token", make_backtest("2000-01-06", 10, 2.0), "model",
+            "2000-01-16")
+    client = make_client(tmp_path, pandas_format=pandas_format,
+            segment_backtests=segment_backtests)
+
+    assert len(client.get_model_backtest("model")) == 15
+    assert list(client.get_model_backtest("model", version_timestamp="2000-01-16")
+            ["prediction"]) == [2.0] * 5
+
+def test_parquet_backtests_stored_with_string_timestamps_are_parsed(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+
+    model_backtest = make_backtest("2000-01-01", 10, 1.0)
+    model_backtest["version_timestamp"] = ["2000-01-06"] * 5 + ["2000-01-11 00:00:00"] * 5
+    client = make_client(tmp_path, pandas_format="parquet")
+    client.log_pandas_artifact("token", model_backtest, "backtest", "model")
+
+    assert len(client.get_model_backtest("model", version_timestamp="2000-01-11")) == 5
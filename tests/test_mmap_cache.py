@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+from mlgit.mmap_cache import MmapModelCache
+
+def test_put_and_get_map_buffers(tmp_path) -> None:
+    mmap_cache = MmapModelCache(str(tmp_path), min_buffer_bytes=1024)
+    mmap_cache.put("model/v1/", {"weights": bytearray(b"x" * 4096), "name": "v1"})
+
+    model = mmap_cache.get("model/v1/")
+
+    assert bytes(model["weights"]) == b"x" * 4096 and model["name"] == "v1"
+    assert mmap_cache.get("model/v2/") is None
+
+def test_filling_one_key_does_not_block_others(tmp_path) -> None:
+    mmap_cache = MmapModelCache(str(tmp_path))
+    filling_a = threading.Event()
+    filled_b = threading.Event()
+
+    def fill_a() -> None:
+        with mmap_cache.filling("a/"):
+            filling_a.set()
+            filled_b.wait(5)
+
+    thread = threading.Thread(target=fill_a)
+    thread.start()
+    filling_a.wait(5)
+
+    with mmap_cache.filling("b/"):
+        filled_b.set()
+
+    thread.join()
+
+def test_evicts_least_recently_loaded_entries(tmp_path) -> None:
+    mmap_cache = MmapModelCache(str(tmp_path), min_buffer_bytes=1024,
+            max_bytes=3 * 2 ** 16 + 4096)
+
+    for key in ["a/", "b/"]:
+        mmap_cache.put(key, bytearray(2 ** 16))
+        time.sleep(0.01)
+
+    mmap_cache.get("a/")
+    time.sleep(0.01)
+    mmap_cache.put("c/", bytearray(2 ** 16))
+    time.sleep(0.01)
+    mmap_cache.put("d/", bytearray(2 ** 16))
+
+    assert mmap_cache.get("b/") is None
+    assert mmap_cache.get("a/") is not None and mmap_cache.get("d/") is not None
+
+def test_entries_being_filled_are_not_evicted(tmp_path) -> None:
+    mmap_cache = MmapModelCache(str(tmp_path), min_buffer_bytes=1024, max_bytes=2 ** 16)
+    mmap_cache.put("a/", bytearray(2 ** 16))
+    filling_a = threading.Event()
+    filled_b = threading.Event()
+
+    def fill_a() -> None:
+        with mmap_cache.filling("a/"):
+            filling_a.set()
+            filled_b.wait(5)
+
+    thread = threading.Thread(target=fill_a)
+    thread.start()
+    filling_a.wait(5)
+
+    with mmap_cache.filling("b/"):
+        mmap_cache.put("b/", bytearray(2 ** 16))
+
+    filled_b.set()
+    thread.join()
+
+    assert mmap_cache.get("a/") is not None
+    assert not any(fname.endswith(".tmp") for fname in os.listdir(tmp_path))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pyutils")
+
+from mlgit.compression import get_codec
+from mlgit.model_serializers import get_model_serializer, read_model_metadata, \
+        restore_model, save_model
+
+def make_tensors() -> dict:
+    rng = np.random.default_rng(0)
+
+    return {
+        "scalar": np.array(3.5),
+        "matrix": rng.normal(size=(64, 32)),
+        "empty": np.zeros((0, 4), dtype=np.float32),
+        "strided": rng.integers(0, 100, size=(16, 16))[::2, 1::3],
+        "transposed": rng.normal(size=(8, 5)).T,
+        "big_endian": np.arange(10, dtype=">i4"),
+        "bools": rng.normal(size=7) > 0,
+        "trailing_empty": np.zeros(0, dtype=np.int64)
+    }
+
+def assert_same_tensors(restored: dict, tensors: dict) -> None:
+    assert list(restored) == list(tensors)
+
+    for name, array in tensors.items():
+        assert restored[name].shape == array.shape, name
+        assert restored[name].dtype == array.dtype, name
+        np.testing.assert_array_equal(restored[name], array)
+
+@pytest.mark.parametrize("model_serializer", ["tensors", "pickle5"])
+@pytest.mark.parametrize("codec", [None, "gzip"])
+def test_tensor_round_trip(tmp_path, model_serializer: str, codec: str) -> None:
+    tensors = make_tensors()
+    save_model(tensors, str(tmp_path), get_model_serializer(model_serializer), get_codec(codec))
+
+    assert read_model_metadata(str(tmp_path)) == {"serializer": model_serializer, "codec": codec}
+    assert_same_tensors(restore_model(str(tmp_path)), tensors)
+
+def test_pickle5_keeps_objects_and_buffers(tmp_path) -> None:
+    model = {"weights": np.arange(1000, dtype=np.float64), "name": "model", "layers": [1, 2]}
+    save_model(model, str(tmp_path), get_model_serializer("pickle5"))
+    restored = restore_model(str(tmp_path))
+
+    assert restored["name"] == "model" and restored["layers"] == [1, 2]
+    np.testing.assert_array_equal(restored["weights"], model["weights"])
+
+def test_tensors_reject_object_arrays_and_non_dicts(tmp_path) -> None:
+    tensor_serializer = get_model_serializer("tensors")
+
+    with pytest.raises(TypeError):
+        tensor_serializer.save({"objects": np.array([object()])}, str(tmp_path / "model"))
+
+    with pytest.raises(TypeError):
+        tensor_serializer.save([np.zeros(3)], str(tmp_path / "model"))
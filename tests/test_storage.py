@@ -0,0 +1,117 @@
+import shutil
+import threading
+
+import pytest
+
+pytest.importorskip("pyutils")
+
+if shutil.which("git") is None:
+    pytest.skip("git is not installed", allow_module_level=True)
+
+from pyutils.pickable import PickableObject
+
+from mlgit.errors import ConflictError
+from mlgit.mlgit_client import MLGitClient
+from mlgit.storage import BareGitStorage, is_not_found
+
+class Model(PickableObject):
+    def __init__(self, weights: list = None):
+        self.weights = weights or [0.0]
+
+def run_threads(target: callable, nthreads: int) -> None:
+    errors = []
+
+    def run(thread_idx: int) -> None:
+        try:
+            target(thread_idx)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(thread_idx,)) for thread_idx in range(nthreads)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+def test_bare_git_round_trip(tmp_path) -> None:
+    storage = BareGitStorage(str(tmp_path / "registry.git"))
+
+    with pytest.raises(FileNotFoundError):
+        storage.read_file("model/versions.json")
+
+    storage.write_files("token", {"model/versions.json": b"[]", "model/v1/model.pkl": b"x"})
+    content, etag = storage.read_file("model/versions.json")
+
+    assert content == b"[]"
+    assert storage.read_file("model/versions.json", etag) == (None, etag)
+    assert sorted(storage.list_directory("model")) == ["model/v1/model.pkl", "model/versions.json"]
+    assert storage.existing_files(["model/versions.json", "model/v2.json"]) == \
+            {"model/versions.json"}
+
+    storage.delete_files("token", ["model/v1/model.pkl", "model/missing.json"])
+
+    assert storage.list_directory("model") == ["model/versions.json"]
+    assert BareGitStorage(str(tmp_path / "registry.git")).read_file("model/versions.json")[0] == \
+            b"[]"
+
+def test_bare_git_pushes_local_files(tmp_path) -> None:
+    storage = BareGitStorage(str(tmp_path / "registry.git"))
+    (tmp_path / "local").mkdir()
+    (tmp_path / "local" / "model.pkl").write_bytes(b"model")
+    (tmp_path / "local" / "metrics.json").write_bytes(b"{}")
+
+    storage.push_directory("token", str(tmp_path / "local"), "model/v1")
+
+    assert sorted(storage.list_directory("model/v1")) == ["model/v1/metrics.json",
+            "model/v1/model.pkl"]
+    assert storage.read_file("model/v1/model.pkl")[0] == b"model"
+
+def test_bare_git_compare_and_swap(tmp_path) -> None:
+    storage = BareGitStorage(str(tmp_path / "registry.git"))
+    storage.write_files("token", {"versions.json": b"[]"}, {"versions.json": None})
+    _, version = storage.read_file_version("versions.json")
+    storage.write_files("token", {"versions.json": b"[1]"}, {"versions.json": version})
+
+    with pytest.raises(ConflictError):
+        storage.write_files("token", {"versions.json": b"[2]"}, {"versions.json": version})
+
+    with pytest.raises(ConflictError):
+        storage.write_files("token", {"versions.json": b"[2]"}, {"versions.json": None})
+
+    assert storage.read_file("versions.json")[0] == b"[1]"
+
+def test_bare_git_concurrent_writers_each_land_their_commit(tmp_path) -> None:
+    storage = BareGitStorage(str(tmp_path / "registry.git"))
+
+    run_threads(lambda thread_idx: storage.write_files("token",
+            {f"files/file_{thread_idx}.txt": str(thread_idx).encode()}), 10)
+
+    assert sorted(storage.list_directory("files")) == \
+            sorted(f"files/file_{thread_idx}.txt" for thread_idx in range(10))
+    assert len(storage.git("rev-list", "refs/heads/main").split()) == 10
+
+def test_bare_git_concurrent_loggers_lose_no_versions(tmp_path) -> None:
+    storage = BareGitStorage(str(tmp_path / "registry.git"))
+
+    def make_client() -> MLGitClient:
+        return MLGitClient(None, None, "registry", storage=storage)
+
+    run_threads(lambda thread_idx: make_client().log_model_version("token", Model(),
+            "model", f"v{thread_idx}"), 10)
+
+    assert sorted(make_client().get_version_list("model")) == \
+            sorted(f"v{thread_idx}" for thread_idx in range(10))
+    assert make_client().get_registry_manifest()["models"]["model"]["count"] == 10
+
+def test_bare_git_missing_files_are_reported_as_not_found(tmp_path) -> None:
+    storage = BareGitStorage(str(tmp_path / "registry.git"))
+
+    with pytest.raises(Exception) as error_info:
+        storage.list_directory("model")
+
+    assert is_not_found(error_info.value)
+    assert storage.list_file_names("model") == []